@@ -18,6 +18,8 @@ Request parameters:
   - data_sample_bytes: Max bytes to read when comparing data (default 64KB).
                        Set to 0 to read entire resource.
   - delta_filter: Filter results by delta presence: "all" (default), "with_delta", "without_delta"
+  - track_data: Compare resource contents between usages (default true). When false,
+                only usages and pipeline info are reported (no has_delta/delta).
 
 delta field:
   - Only present when actual binary data differs from previous state
@@ -34,13 +36,24 @@ ResourceUsage values:
   - Copy, CopySrc, CopyDst, Barrier, CPUWrite
 """
 
+import heapq
 import json
 import re
 import struct
 import traceback
+from operator import attrgetter
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 
 REQ_PATH = "find_resource_uses_json.request.json"
 RESP_PATH = "find_resource_uses_json.response.json"
@@ -471,8 +484,11 @@ def find_changed_bytes_region(old_data, new_data, max_regions=3):
 
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    # Encode the whole envelope up front (orjson when the embedded Python has it)
+    # and hand it to the file in a single write.
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
 
 
 # ---------------------------------------------------------------------------
@@ -503,9 +519,22 @@ def build_resource_maps(controller):
     return id_to_name, name_to_res, id_to_res
 
 
-def get_name(id_to_name, rid):
-    """Look up a resource name by ID."""
-    return id_to_name.get(int(rid), str(rid))
+def get_name(id_to_name, rid, name_cache=None):
+    """Look up a resource name by ID.
+
+    name_cache, when given, is keyed by the ResourceId object itself so repeated
+    lookups skip the native -> int conversion.
+    """
+    if name_cache is None:
+        return id_to_name.get(int(rid), str(rid))
+    try:
+        return name_cache[rid]
+    except KeyError:
+        name = name_cache[rid] = id_to_name.get(int(rid), str(rid))
+        return name
+    except TypeError:
+        # ResourceId not hashable in this build
+        return id_to_name.get(int(rid), str(rid))
 
 
 # ---------------------------------------------------------------------------
@@ -919,6 +948,31 @@ def usage_to_str(usage):
         return str(usage)
 
 
+def iter_usages_by_event(usages, limit):
+    """
+    Yield usages in eventId order (stable), without sorting the whole list up front.
+
+    The first `limit` usages come from heapq.nsmallest; if the caller keeps
+    consuming past that window (dedup or delta filtering dropped entries), the
+    remainder is produced from a full sort.
+    """
+    key = attrgetter("eventId")
+    if not limit or len(usages) <= limit:
+        yield from sorted(usages, key=key)
+        return
+
+    head = heapq.nsmallest(limit, usages, key=key)
+    yield from head
+    yield from sorted(usages, key=key)[len(head):]
+
+
+def skips_data_compare(usage_str):
+    """True for read-only usages whose data never needs to be compared."""
+    if usage_str in ("CopySrc", "ResolveSrc", "Indirect", "VertexBuffer", "IndexBuffer"):
+        return True
+    return usage_str.endswith("_Constants") or (usage_str.endswith("_Resource") and "RW" not in usage_str)
+
+
 def find_resource(controller, id_to_name, name_to_res, id_to_res, resource_query):
     """
     Find a resource by name or ID.
@@ -940,11 +994,12 @@ def find_resource(controller, id_to_name, name_to_res, id_to_res, resource_query
         rtype = str(res.type).replace("ResourceType.", "")
         return res, resource_query, rtype
 
-    # Try partial match
+    # Try partial match (length guard rejects short names before the substring scan)
+    query_len = len(resource_query)
     matches = []
     for res in controller.GetResources():
         name = res.name or ""
-        if resource_query in name:
+        if len(name) >= query_len and resource_query in name:
             matches.append((res, name, str(res.type).replace("ResourceType.", "")))
 
     if len(matches) == 1:
@@ -962,10 +1017,15 @@ def find_resource(controller, id_to_name, name_to_res, id_to_res, resource_query
     )
 
 
-def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, usage_str):
+def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, usage_str, refl_cache=None, name_cache=None):
     """
     Get pipeline and binding info at a specific event for a resource.
     Returns dict with pipeline_name, stage, entry_point, binding info.
+
+    refl_cache maps (shader_id, stage) -> reflection; shader modules are
+    immutable within a capture so entries never need invalidating. It is
+    keyed by the stage's own shader rather than the pipeline, since at a
+    dispatch the last bound graphics pipeline is still reported.
     """
     info = {}
 
@@ -976,7 +1036,7 @@ def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, us
     try:
         pipe_id = state.GetGraphicsPipelineObject()
         if pipe_id != rd.ResourceId.Null():
-            info["pipeline_name"] = get_name(id_to_name, pipe_id)
+            info["pipeline_name"] = get_name(id_to_name, pipe_id, name_cache)
     except Exception:
         pass
 
@@ -984,7 +1044,7 @@ def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, us
         try:
             pipe_id = state.GetComputePipelineObject()
             if pipe_id != rd.ResourceId.Null():
-                info["pipeline_name"] = get_name(id_to_name, pipe_id)
+                info["pipeline_name"] = get_name(id_to_name, pipe_id, name_cache)
         except Exception:
             pass
 
@@ -1010,7 +1070,22 @@ def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, us
             if _STAGE_NAMES.get(stage) != stage_name:
                 continue
 
-            refl = state.GetShaderReflection(stage)
+            cache_key = None
+            if refl_cache is not None:
+                try:
+                    shader_id = state.GetShader(stage)
+                    if shader_id != rd.ResourceId.Null():
+                        cache_key = (int(shader_id), int(stage))
+                except Exception:
+                    pass
+
+            if cache_key is not None:
+                if cache_key in refl_cache:
+                    refl = refl_cache[cache_key]
+                else:
+                    refl = refl_cache[cache_key] = state.GetShaderReflection(stage)
+            else:
+                refl = state.GetShaderReflection(stage)
             if refl is None:
                 continue
 
@@ -1050,176 +1125,195 @@ def get_pipeline_info_at_event(controller, id_to_name, event_id, resource_id, us
     return info
 
 
-def main() -> None:
-    with open(REQ_PATH, "r", encoding="utf-8") as f:
-        req = json.load(f)
+def find_uses(controller, resource_maps, req, usage_cache, refl_cache):
+    """Run a single find-uses query against an open capture and return the result document."""
+    id_to_name, name_to_res, id_to_res = resource_maps
 
     resource_query = req["resource"]
     max_results = req.get("max_results", 500)
     data_sample_bytes = req.get("data_sample_bytes") or (64 * 1024)  # 64KB default
     delta_filter = req.get("delta_filter", "all")  # "all", "with_delta", "without_delta"
+    track_data = req.get("track_data")
+    if track_data is None:
+        track_data = True
 
-    rd.InitialiseReplay(rd.GlobalEnvironment(), [])
-
-    cap = rd.OpenCaptureFile()
-    try:
-        result = cap.OpenFile(req["capture_path"], "", None)
-        if result != rd.ResultCode.Succeeded:
-            raise RuntimeError("Couldn't open file: " + str(result))
-
-        if not cap.LocalReplaySupport():
-            raise RuntimeError("Capture cannot be replayed")
-
-        result, controller = cap.OpenCapture(rd.ReplayOptions(), None)
-        if result != rd.ResultCode.Succeeded:
-            raise RuntimeError("Couldn't initialise replay: " + str(result))
+    # Find the resource - returns ResourceDescription object
+    resource_desc, resource_name, resource_type = find_resource(
+        controller, id_to_name, name_to_res, id_to_res, resource_query
+    )
+    resource_id = int(resource_desc.resourceId)
 
+    # Try to infer buffer struct layout from shader reflection
+    buffer_fields = None
+    buffer_stride = None
+    if track_data and resource_type == "Buffer":
         try:
-            id_to_name, name_to_res, id_to_res = build_resource_maps(controller)
-
-            # Find the resource - returns ResourceDescription object
-            resource_desc, resource_name, resource_type = find_resource(
-                controller, id_to_name, name_to_res, id_to_res, resource_query
+            buffer_fields, buffer_stride = infer_buffer_layout(
+                controller, resource_desc.resourceId
             )
-            resource_id = int(resource_desc.resourceId)
-
-            # Try to infer buffer struct layout from shader reflection
-            buffer_fields = None
-            buffer_stride = None
-            if resource_type == "Buffer":
-                try:
-                    buffer_fields, buffer_stride = infer_buffer_layout(
-                        controller, resource_desc.resourceId
-                    )
-                except Exception:
-                    pass
+        except Exception:
+            pass
 
-            # Get all usages - pass the actual ResourceId object
-            usages = controller.GetUsage(resource_desc.resourceId)
+    # Get all usages - pass the actual ResourceId object. Usages are fixed
+    # for a capture, so they are cached per resource for the run.
+    usages = usage_cache.get(resource_id)
+    if usages is None:
+        usages = usage_cache[resource_id] = controller.GetUsage(resource_desc.resourceId)
+
+    # Order usages by event_id for data change tracking, only sorting as
+    # far into the list as max_results needs.
+    usages_in_order = iter_usages_by_event(usages, max_results * 2 if max_results else 0)
+
+    uses = []
+    # Dedup on a packed int (event_id << 8 | dense usage code) rather than
+    # an (event_id, usage_str) tuple.
+    seen_events = set()
+    usage_codes = {}
+    name_cache = {}
+
+    # For data change tracking: store the last known data state.
+    # It is seeded with the contents just before the first usage that gets
+    # compared, so that usage gets a real data diff instead of a
+    # pipeline-state write-target probe.
+    last_data = None
+    baseline_seeded = False
+
+    for usage in usages_in_order:
+        event_id = int(usage.eventId)
+        usage_str = usage_to_str(usage.usage)
+
+        # Skip if we've seen this event+usage combination
+        code = usage_codes.get(usage_str)
+        if code is None:
+            code = usage_codes[usage_str] = len(usage_codes)
+        key = (event_id << 8) | code
+        if key in seen_events:
+            continue
+        seen_events.add(key)
+
+        use_entry = {
+            "event_id": event_id,
+            "usage": usage_str,
+        }
+
+        # Determine has_delta by comparing actual data
+        # For read-only usages, skip data comparison
+        if track_data and skips_data_compare(usage_str):
+            use_entry["has_delta"] = False
+        elif track_data:
+            if not baseline_seeded:
+                baseline_seeded = True
+                controller.SetFrameEvent(max(event_id - 1, 0), True)
+                last_data, _ = read_resource_data(controller, resource_desc, data_sample_bytes)
+
+            # For potential write usages, compare actual data
+            controller.SetFrameEvent(event_id, True)  # replay TO this event
+            current_data, read_error = read_resource_data(controller, resource_desc, data_sample_bytes)
+
+            if current_data is not None:
+                if last_data is None:
+                    # No baseline could be read - can't determine if changed
+                    use_entry["has_delta"] = None
+                else:
+                    # Compare with previous data
+                    if current_data != last_data:
+                        use_entry["has_delta"] = True
+
+                        # Compute delta showing first changed element
+                        if buffer_fields and buffer_stride:
+                            # Use semantic diff - get first changed element only
+                            changed_elements = find_changed_buffer_elements(
+                                buffer_fields, buffer_stride,
+                                last_data, current_data,
+                                max_elements=1
+                            )
+                            if changed_elements:
+                                # Return just the first changed element directly
+                                first_change = changed_elements[0]
+                                use_entry["delta"] = {
+                                    "element": first_change["element"],
+                                    "fields": first_change["delta"],
+                                }
+                            else:
+                                # Changed but couldn't parse elements - show first byte region
+                                byte_regions = find_changed_bytes_region(last_data, current_data, max_regions=1)
+                                if byte_regions:
+                                    use_entry["delta"] = byte_regions[0]
+                        else:
+                            # No buffer layout - show first byte region
+                            byte_regions = find_changed_bytes_region(last_data, current_data, max_regions=1)
+                            if byte_regions:
+                                use_entry["delta"] = byte_regions[0]
+                    else:
+                        use_entry["has_delta"] = False
 
-            # Sort usages by event_id for data change tracking
-            usages_list = list(usages)
-            usages_list.sort(key=lambda u: u.eventId)
+                last_data = current_data
+            else:
+                # Couldn't read data - fall back to binding check
+                is_write_target = is_bound_as_write_target(
+                    controller, resource_desc.resourceId, event_id
+                )
+                if is_write_target is not None:
+                    use_entry["has_delta"] = is_write_target
+
+        # Add view info if available
+        if usage.view != rd.ResourceId.Null():
+            use_entry["view_id"] = int(usage.view)
+            use_entry["view_name"] = get_name(id_to_name, usage.view, name_cache)
+
+        # Get pipeline info for this event
+        try:
+            pipeline_info = get_pipeline_info_at_event(
+                controller, id_to_name, event_id, resource_id, usage_str, refl_cache, name_cache
+            )
+            use_entry.update(pipeline_info)
+        except Exception:
+            pass
 
-            uses = []
-            seen_events = set()
+        # Apply delta filter
+        entry_has_delta = use_entry.get("has_delta") == True
+        if delta_filter == "with_delta" and not entry_has_delta:
+            continue
+        if delta_filter == "without_delta" and entry_has_delta:
+            continue
 
-            # For data change tracking: store the last known data state
-            last_data = None
+        uses.append(use_entry)
 
-            for usage in usages_list:
-                event_id = int(usage.eventId)
-                usage_str = usage_to_str(usage.usage)
+        if max_results and len(uses) >= max_results:
+            break
 
-                # Skip if we've seen this event+usage combination
-                key = (event_id, usage_str)
-                if key in seen_events:
-                    continue
-                seen_events.add(key)
+    return {
+        "total_uses": len(uses),
+        "truncated": max_results and len(uses) >= max_results,
+        "uses": uses,
+    }
 
-                use_entry = {
-                    "event_id": event_id,
-                    "usage": usage_str,
-                }
 
-                # Determine has_delta by comparing actual data
-                # For read-only usages, skip data comparison
-                if usage_str in ("CopySrc", "ResolveSrc", "Indirect", "VertexBuffer", "IndexBuffer"):
-                    use_entry["has_delta"] = False
-                elif usage_str.endswith("_Constants") or (usage_str.endswith("_Resource") and "RW" not in usage_str):
-                    use_entry["has_delta"] = False
-                else:
-                    # For potential write usages, compare actual data
-                    controller.SetFrameEvent(event_id, True)  # replay TO this event
-                    current_data, read_error = read_resource_data(controller, resource_desc, data_sample_bytes)
-
-                    if current_data is not None:
-                        if last_data is None:
-                            # First time reading data - can't determine if changed
-                            # Check if it's bound as a write target
-                            is_write_target = is_bound_as_write_target(
-                                controller, resource_desc.resourceId, event_id
-                            )
-                            if is_write_target:
-                                # Could have been written, but we don't know for sure
-                                use_entry["has_delta"] = None
-                            else:
-                                use_entry["has_delta"] = False
-                        else:
-                            # Compare with previous data
-                            if current_data != last_data:
-                                use_entry["has_delta"] = True
-
-                                # Compute delta showing first changed element
-                                if buffer_fields and buffer_stride:
-                                    # Use semantic diff - get first changed element only
-                                    changed_elements = find_changed_buffer_elements(
-                                        buffer_fields, buffer_stride,
-                                        last_data, current_data,
-                                        max_elements=1
-                                    )
-                                    if changed_elements:
-                                        # Return just the first changed element directly
-                                        first_change = changed_elements[0]
-                                        use_entry["delta"] = {
-                                            "element": first_change["element"],
-                                            "fields": first_change["delta"],
-                                        }
-                                    else:
-                                        # Changed but couldn't parse elements - show first byte region
-                                        byte_regions = find_changed_bytes_region(last_data, current_data, max_regions=1)
-                                        if byte_regions:
-                                            use_entry["delta"] = byte_regions[0]
-                                else:
-                                    # No buffer layout - show first byte region
-                                    byte_regions = find_changed_bytes_region(last_data, current_data, max_regions=1)
-                                    if byte_regions:
-                                        use_entry["delta"] = byte_regions[0]
-                            else:
-                                use_entry["has_delta"] = False
+def main() -> None:
+    with open(REQ_PATH, "r", encoding="utf-8") as f:
+        req = json.load(f)
 
-                        last_data = current_data
-                    else:
-                        # Couldn't read data - fall back to binding check
-                        is_write_target = is_bound_as_write_target(
-                            controller, resource_desc.resourceId, event_id
-                        )
-                        if is_write_target is not None:
-                            use_entry["has_delta"] = is_write_target
-
-                # Add view info if available
-                if usage.view != rd.ResourceId.Null():
-                    use_entry["view_id"] = int(usage.view)
-                    use_entry["view_name"] = get_name(id_to_name, usage.view)
-
-                # Get pipeline info for this event
-                try:
-                    pipeline_info = get_pipeline_info_at_event(
-                        controller, id_to_name, event_id, resource_id, usage_str
-                    )
-                    use_entry.update(pipeline_info)
-                except Exception:
-                    pass
+    rd.InitialiseReplay(rd.GlobalEnvironment(), [])
 
-                # Apply delta filter
-                entry_has_delta = use_entry.get("has_delta") == True
-                if delta_filter == "with_delta" and not entry_has_delta:
-                    continue
-                if delta_filter == "without_delta" and entry_has_delta:
-                    continue
+    cap = rd.OpenCaptureFile()
+    try:
+        result = cap.OpenFile(req["capture_path"], "", None)
+        if result != rd.ResultCode.Succeeded:
+            raise RuntimeError("Couldn't open file: " + str(result))
 
-                uses.append(use_entry)
+        if not cap.LocalReplaySupport():
+            raise RuntimeError("Capture cannot be replayed")
 
-                if max_results and len(uses) >= max_results:
-                    break
+        result, controller = cap.OpenCapture(rd.ReplayOptions(), None)
+        if result != rd.ResultCode.Succeeded:
+            raise RuntimeError("Couldn't initialise replay: " + str(result))
 
-            # Build result
-            document = {
-                "total_uses": len(uses),
-                "truncated": max_results and len(uses) >= max_results,
-                "uses": uses,
-            }
+        try:
+            resource_maps = build_resource_maps(controller)
+            usage_cache = {}
+            refl_cache = {}
 
+            document = find_uses(controller, resource_maps, req, usage_cache, refl_cache)
             write_envelope(True, result=document)
         finally:
             try:
@@ -5,31 +5,56 @@ Finds a buffer by name, automatically infers the struct layout from the shader t
 references the buffer, reads struct-formatted data at specified element indices at
 every action in the frame, and returns only the snapshots where a value actually changed.
 
-Uses delta encoding: initial_state is the full state, changes contain only diffs.
+Uses delta encoding: initial_state is the full nested state, changes contain only
+diffs as [[field_id, new_value], ...] referencing the "fields" list.
 
 Returns:
   - tracked_indices: The element indices that were tracked
+  - fields: Array of {id, name, type} for every tracked scalar field
   - total_changes: Total number of changes detected
   - elements: Array of {buffer_index, initial_event_id, initial_state, changes}
 
+Request parameters:
+  - buffer_name: Name of the buffer to track (required)
+  - capture_path: Path to the RenderDoc capture file (required)
+  - tracked_indices: Element indices to track (default [0])
+  - fields_filter: Optional list of field names to track; a name also selects
+                   everything nested under it (e.g. "light" -> "light.color[0]")
+
 Use get_buffer_details for schema, stride, and usage information.
 """
 
 import struct
 import json
-import re
 import traceback
+from itertools import compress
+from operator import ne
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data.decode("utf-8"))
+
 
 REQ_PATH = "get_buffer_changes_delta_json.request.json"
 RESP_PATH = "get_buffer_changes_delta_json.response.json"
 
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
 
 
 # ---------------------------------------------------------------------------
@@ -98,10 +123,11 @@ def build_type_schema(members):
     schema = {}
     for const in members:
         ctype = const.type
+        sub_members = ctype.members
+        arr_count = max(ctype.elements, 1)
 
-        if len(ctype.members) > 0:
-            inner = build_type_schema(ctype.members)
-            arr_count = max(ctype.elements, 1)
+        if len(sub_members) > 0:
+            inner = build_type_schema(sub_members)
             if arr_count > 1:
                 schema[const.name] = {"_array": arr_count, "_element": inner}
             else:
@@ -111,7 +137,6 @@ def build_type_schema(members):
         base_name = vartype_to_name(ctype.baseType)
         rows = max(ctype.rows, 1)
         cols = max(ctype.columns, 1)
-        arr_count = max(ctype.elements, 1)
 
         if rows > 1 and cols > 1:
             core = "%s[%d][%d]" % (base_name, rows, cols)
@@ -134,38 +159,44 @@ def build_type_schema(members):
 
 class FieldDef:
     """A single scalar column we'll read from the buffer."""
-    __slots__ = ('name', 'byte_offset', 'struct_char')
+    __slots__ = ('name', 'byte_offset', 'struct_char', 'type_name')
 
-    def __init__(self, name, byte_offset, struct_char):
+    def __init__(self, name, byte_offset, struct_char, type_name='unknown'):
         self.name = name
         self.byte_offset = byte_offset
         self.struct_char = struct_char
+        self.type_name = type_name
 
 
 def flatten_constant_type(prefix, const, base_offset):
     """Recursively flatten a ShaderConstant into a list of FieldDef."""
+    # Each attribute read on a reflection object crosses into native code;
+    # read them once up front.
     ctype = const.type
+    members = ctype.members
+    arr_count = max(ctype.elements, 1)
+    arr_stride = ctype.arrayByteStride
     abs_offset = base_offset + const.byteOffset
     field_name = ("%s.%s" % (prefix, const.name)) if prefix else const.name
 
-    if len(ctype.members) > 0:
+    if len(members) > 0:
         fields = []
-        arr_count = max(ctype.elements, 1)
         for arr_i in range(arr_count):
             arr_prefix = ("%s[%d]" % (field_name, arr_i)) if arr_count > 1 else field_name
-            elem_offset = abs_offset + arr_i * ctype.arrayByteStride if arr_count > 1 else abs_offset
-            for member in ctype.members:
+            elem_offset = abs_offset + arr_i * arr_stride if arr_count > 1 else abs_offset
+            for member in members:
                 fields.extend(flatten_constant_type(arr_prefix, member, elem_offset))
         return fields
 
-    char = vartype_to_struct_char(ctype.baseType)
+    base_type = ctype.baseType
+    char = vartype_to_struct_char(base_type)
     if char is None:
         return []
 
-    scalar_size = vartype_byte_size(ctype.baseType)
+    scalar_size = vartype_byte_size(base_type)
+    type_name = vartype_to_name(base_type)
     fields = []
 
-    arr_count = max(ctype.elements, 1)
     rows = max(ctype.rows, 1)
     cols = max(ctype.columns, 1)
     total_scalars = rows * cols
@@ -174,12 +205,12 @@ def flatten_constant_type(prefix, const, base_offset):
         arr_name = ("%s[%d]" % (field_name, arr_i)) if arr_count > 1 else field_name
 
         if arr_count > 1:
-            elem_base = abs_offset + arr_i * ctype.arrayByteStride
+            elem_base = abs_offset + arr_i * arr_stride
         else:
             elem_base = abs_offset
 
         if total_scalars == 1:
-            fields.append(FieldDef(arr_name, elem_base, char))
+            fields.append(FieldDef(arr_name, elem_base, char, type_name))
         else:
             for r in range(rows):
                 for c in range(cols):
@@ -189,53 +220,90 @@ def flatten_constant_type(prefix, const, base_offset):
                     else:
                         comp_name = "%s[%d]" % (arr_name, comp_idx)
                     comp_offset = elem_base + comp_idx * scalar_size
-                    fields.append(FieldDef(comp_name, comp_offset, char))
+                    fields.append(FieldDef(comp_name, comp_offset, char, type_name))
 
     return fields
 
 
-def leaves(roots):
-    for a in roots:
-        if len(a.children) > 0:
-            yield from leaves(a.children)
-        else:
-            yield a
-
-
-def infer_layout_from_reflection(controller, buf_id):
-    """Find a shader that references buf_id and extract the struct layout."""
-    actions = list(leaves(controller.GetRootActions()))
-    stages_to_check = [
-        rd.ShaderStage.Compute,
-        rd.ShaderStage.Vertex,
-        rd.ShaderStage.Fragment,
-        rd.ShaderStage.Geometry,
-        rd.ShaderStage.Tess_Eval,
-        rd.ShaderStage.Tess_Control,
-    ]
+# A dispatch only has a compute shader bound and a draw never does, so each
+# action only needs the reflection of its own pipeline type's stages.
+COMPUTE_STAGES = (rd.ShaderStage.Compute,)
+GRAPHICS_STAGES = (
+    rd.ShaderStage.Vertex,
+    rd.ShaderStage.Fragment,
+    rd.ShaderStage.Geometry,
+    rd.ShaderStage.Tess_Eval,
+    rd.ShaderStage.Tess_Control,
+)
+
+
+def is_drawcall_like(flags: int) -> bool:
+    return bool(
+        (flags & rd.ActionFlags.Drawcall)
+        or (flags & rd.ActionFlags.Dispatch)
+        or (flags & rd.ActionFlags.MeshDispatch)
+        or (flags & rd.ActionFlags.DispatchRay)
+    )
+
+
+def reflection_declares_buffer(cache, shader_id, is_rw, refl_list):
+    """Whether a shader's RW/RO reflection list declares any buffer, memoized per shader."""
+    key = (shader_id, is_rw)
+    found = cache.get(key)
+    if found is None:
+        found = False
+        for res in refl_list:
+            try:
+                if not res.isTexture:
+                    found = True
+                    break
+            except Exception:
+                found = True
+                break
+        cache[key] = found
+    return found
+
+
+def infer_layout_from_reflection(controller, buf_id, actions):
+    """
+    Find a shader that references buf_id and extract the struct layout.
 
+    Only draws and dispatches can have shader bindings, so every other action
+    (clears, copies, markers) is skipped without paying for a SetFrameEvent.
+    A stage's read-write or read-only bindings are only fetched if its shader
+    declares a buffer of that kind.
+    """
+    declares_buffer = {}
     for action in actions:
+        flags = action.flags
+        if not is_drawcall_like(flags):
+            continue
+        stages = COMPUTE_STAGES if flags & rd.ActionFlags.Dispatch else GRAPHICS_STAGES
         controller.SetFrameEvent(action.eventId, False)
         state = controller.GetPipelineState()
 
-        for stage in stages_to_check:
+        for stage in stages:
             refl = state.GetShaderReflection(stage)
             if refl is None:
                 continue
 
-            rw_list = state.GetReadWriteResources(stage)
-            for i, used in enumerate(rw_list):
-                if used.descriptor.resource == buf_id:
-                    if i < len(refl.readWriteResources):
-                        res = refl.readWriteResources[i]
-                        return extract_fields_from_resource(res)
+            shader_id = int(refl.resourceId)
+
+            refl_rw = refl.readWriteResources
+            if reflection_declares_buffer(declares_buffer, shader_id, True, refl_rw):
+                rw_ids = [used.descriptor.resource for used in state.GetReadWriteResources(stage)]
+                if buf_id in rw_ids:
+                    for i, rid in enumerate(rw_ids):
+                        if rid == buf_id and i < len(refl_rw):
+                            return extract_fields_from_resource(refl_rw[i])
 
-            ro_list = state.GetReadOnlyResources(stage)
-            for i, used in enumerate(ro_list):
-                if used.descriptor.resource == buf_id:
-                    if i < len(refl.readOnlyResources):
-                        res = refl.readOnlyResources[i]
-                        return extract_fields_from_resource(res)
+            refl_ro = refl.readOnlyResources
+            if reflection_declares_buffer(declares_buffer, shader_id, False, refl_ro):
+                ro_ids = [used.descriptor.resource for used in state.GetReadOnlyResources(stage)]
+                if buf_id in ro_ids:
+                    for i, rid in enumerate(ro_ids):
+                        if rid == buf_id and i < len(refl_ro):
+                            return extract_fields_from_resource(refl_ro[i])
 
     raise RuntimeError(
         "Could not find any shader that references the target buffer. "
@@ -285,148 +353,124 @@ def extract_fields_from_resource(shader_res):
 # Structured JSON reconstruction from flat field paths
 # ---------------------------------------------------------------------------
 
-PATH_TOKEN_RE = re.compile(
-    r'([A-Za-z_]\w*)'
-    r'|\[(\d+)\]'
-)
-
-
 def parse_field_path(name):
-    """Parse a flat field name into a list of path steps."""
+    """
+    Parse a flat field name into a list of path steps.
+
+    Names are generated by flatten_constant_type ("a.b[2][0].c"), so plain
+    string scanning is enough.
+    """
     steps = []
     for part in name.split('.'):
-        tokens = PATH_TOKEN_RE.findall(part)
-        for tok_name, tok_idx in tokens:
-            if tok_name:
-                steps.append((tok_name, None))
-            else:
-                steps.append((None, int(tok_idx)))
+        i = part.find('[')
+        if i < 0:
+            steps.append((part, None))
+            continue
+        if i > 0:
+            steps.append((part[:i], None))
+        for seg in part[i + 1:].rstrip(']').split(']['):
+            steps.append((None, int(seg)))
     return steps
 
 
-def build_nested(fields, values):
-    """Given a list of FieldDef and values, reconstruct a nested dict/list structure."""
-    root = {}
+def build_insertion_plan(field_paths):
+    """
+    Pre-bake nested reconstruction for a fixed set of field paths.
 
-    for field, val in zip(fields, values):
-        steps = parse_field_path(field.name)
-        insert_at_path(root, steps, val)
+    Returns (template, ops): template is the nested dict/list shape with 0
+    leaves, and ops[i] is (parent_keys, leaf_key) locating field i inside it,
+    or None if the path conflicts with an earlier one and can't be placed.
+    """
+    all_keys = [
+        tuple(key if key is not None else idx for key, idx in steps)
+        for steps in field_paths
+    ]
 
-    clean(root)
-    return root
+    # Final length of every list, keyed by the path of keys leading to it,
+    # so lists are created full-size with 0 and never hold placeholders
+    list_lens = {}
+    for keys in all_keys:
+        for depth, k in enumerate(keys):
+            if isinstance(k, int):
+                prefix = keys[:depth]
+                if k >= list_lens.get(prefix, 0):
+                    list_lens[prefix] = k + 1
+
+    template = {}
+    leaves = set()
+    ops = []
+    for keys in all_keys:
+        node = template
+        try:
+            for depth, k in enumerate(keys[:-1]):
+                if keys[:depth + 1] in leaves:
+                    raise TypeError(k)
+                child = node[k] if isinstance(node, list) else node.get(k)
+                if not isinstance(child, (dict, list)):
+                    if isinstance(keys[depth + 1], int):
+                        child = [0] * list_lens[keys[:depth + 1]]
+                    else:
+                        child = {}
+                    node[k] = child
+                node = child
+            leaf = keys[-1]
+            if isinstance(node, dict):
+                if isinstance(node.get(leaf), (dict, list)):
+                    raise TypeError(leaf)
+                node[leaf] = 0
+            elif not isinstance(leaf, int) or isinstance(node[leaf], (dict, list)):
+                raise TypeError(leaf)
+        except (IndexError, TypeError):
+            ops.append(None)
+            continue
+        leaves.add(keys)
+        ops.append((keys[:-1], leaf))
+    return template, tuple(ops)
 
 
-def insert_at_path(node, steps, value):
-    """Walk/create the nested structure described by steps, set the leaf to value."""
-    for i, (key, idx) in enumerate(steps):
-        is_last = (i == len(steps) - 1)
+def clone_template(obj):
+    """Copy a template's dicts and lists; leaves are immutable scalars."""
+    if isinstance(obj, dict):
+        return {k: clone_template(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [clone_template(v) for v in obj]
+    return obj
 
-        if key is not None and idx is None:
-            if is_last:
-                node[key] = value
-            else:
-                next_key, next_idx = steps[i + 1]
-                if next_key is None and next_idx is not None:
-                    if key not in node:
-                        node[key] = []
-                    node = node[key]
-                else:
-                    if key not in node:
-                        node[key] = {}
-                    node = node[key]
-
-        elif key is not None and idx is not None:
-            if key not in node:
-                node[key] = []
-            lst = node[key]
-            while len(lst) <= idx:
-                lst.append(None)
-
-            if is_last:
-                lst[idx] = value
-            else:
-                next_key, next_idx = steps[i + 1]
-                if next_key is None and next_idx is not None:
-                    if lst[idx] is None:
-                        lst[idx] = []
-                    node = lst[idx]
-                else:
-                    if lst[idx] is None:
-                        lst[idx] = {}
-                    node = lst[idx]
-
-        elif key is None and idx is not None:
-            if not isinstance(node, list):
-                break
-            while len(node) <= idx:
-                node.append(None)
 
-            if is_last:
-                node[idx] = value
-            else:
-                next_key, next_idx = steps[i + 1]
-                if next_key is None and next_idx is not None:
-                    if node[idx] is None:
-                        node[idx] = []
-                    node = node[idx]
-                else:
-                    if node[idx] is None:
-                        node[idx] = {}
-                    node = node[idx]
-
-
-def clean(obj):
-    """Replace any remaining None holes with 0 and recurse."""
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if v is None:
-                obj[k] = 0
-            else:
-                clean(v)
-    elif isinstance(obj, list):
-        for i in range(len(obj)):
-            if obj[i] is None:
-                obj[i] = 0
-            else:
-                clean(obj[i])
+def build_nested(plan, values):
+    """Given a plan from build_insertion_plan and flat values, build the nested structure."""
+    template, ops = plan
+    root = clone_template(template)
+
+    for op, val in zip(ops, values):
+        if op is None:
+            continue
+        node = root
+        for k in op[0]:
+            node = node[k]
+        node[op[1]] = val
+
+    return root
 
 
 # ---------------------------------------------------------------------------
-# Recursive diff for nested structures
+# Sparse diff between flat element snapshots
 # ---------------------------------------------------------------------------
 
-def diff_nested(old, new):
-    """Recursively compare two nested structures and return a sparse patch."""
-    if type(old) != type(new):
-        return new
-
-    if isinstance(old, dict):
-        patch = {}
-        all_keys = set(old.keys()) | set(new.keys())
-        for k in all_keys:
-            if k not in old:
-                patch[k] = new[k]
-            elif k not in new:
-                patch[k] = None
-            else:
-                sub = diff_nested(old[k], new[k])
-                if sub is not None:
-                    patch[k] = sub
-        return patch if patch else None
-
-    if isinstance(old, list):
-        if len(old) != len(new):
-            return new
-        patch = {}
-        for i in range(len(old)):
-            sub = diff_nested(old[i], new[i])
-            if sub is not None:
-                patch[str(i)] = sub
-        return patch if patch else None
-
-    if old != new:
-        return new
-    return None
+def changed_field_indices(old_vals, new_vals):
+    """Positions where two flat value tuples differ (compare loop runs in C)."""
+    return list(compress(range(len(new_vals)), map(ne, old_vals, new_vals)))
+
+
+def build_delta(old_vals, new_vals):
+    """
+    Build a sparse patch from two flat value tuples.
+
+    The patch is a list of [field_id, new_value] pairs, where field_id indexes
+    the document's "fields" list. Returns None if nothing changed.
+    """
+    patch = [[i, new_vals[i]] for i in changed_field_indices(old_vals, new_vals)]
+    return patch if patch else None
 
 
 # ---------------------------------------------------------------------------
@@ -435,12 +479,17 @@ def diff_nested(old, new):
 
 def find_buffer(controller, buffer_name):
     """Locate the target buffer's ResourceId by name."""
-    for res in controller.GetResources():
-        if res.name == buffer_name:
-            return res.resourceId
+    resources = controller.GetResources()
+    id_by_name = {}
+    for res in resources:
+        id_by_name.setdefault(res.name, res.resourceId)
+
+    buf_id = id_by_name.get(buffer_name)
+    if buf_id is not None:
+        return buf_id
 
     available = []
-    for r in controller.GetResources():
+    for r in resources:
         if r.type == rd.ResourceType.Buffer:
             available.append("  %s  %s" % (r.resourceId, r.name))
 
@@ -450,29 +499,153 @@ def find_buffer(controller, buffer_name):
     )
 
 
-def read_elements(controller, buf_id, indices, fields, stride):
-    """Read tracked element indices from the buffer at the current replay state."""
+def build_element_struct(offsets, chars):
+    """
+    Compile a single struct.Struct that unpacks every field of one element.
+
+    Fields are packed in byte_offset order with 'x' padding for the gaps.
+    Returns (elem_struct, perm) where perm maps each field position to
+    its position in the unpacked tuple (None when fields are already in
+    offset order), or (None, None) if fields overlap and can't be expressed
+    as one format.
+    """
+    count = len(offsets)
+    order = sorted(range(count), key=offsets.__getitem__)
+    fmt = ["<"]
+    pos = 0
+    for i in order:
+        off = offsets[i]
+        gap = off - pos
+        if gap < 0:
+            return None, None
+        if gap:
+            fmt.append("%dx" % gap)
+        fmt.append(chars[i])
+        pos = off + struct.calcsize(chars[i])
+
+    perm = None
+    if order != list(range(count)):
+        perm = [0] * count
+        for unpacked_pos, field_pos in enumerate(order):
+            perm[field_pos] = unpacked_pos
+
+    return struct.Struct("".join(fmt)), perm
+
+
+class Layout:
+    """
+    Tracked fields of one element as parallel tuples, plus everything derived
+    from them that the per-action loop needs.
+    """
+    __slots__ = (
+        'names', 'offsets', 'chars', 'type_names', 'paths', 'elem_size', 'elem_struct', 'perm'
+    )
+
+    def __init__(self, fields):
+        self.names = tuple(f.name for f in fields)
+        self.offsets = tuple(f.byte_offset for f in fields)
+        self.chars = tuple(f.struct_char for f in fields)
+        self.type_names = tuple(f.type_name for f in fields)
+        # Field names are fixed once the layout is known; parse them once
+        self.paths = tuple(parse_field_path(n) for n in self.names)
+        # Bytes of each element that actually hold tracked fields
+        self.elem_size = max(
+            off + struct.calcsize(ch) for off, ch in zip(self.offsets, self.chars)
+        )
+        self.elem_struct, self.perm = build_element_struct(self.offsets, self.chars)
+
+    def unpack(self, blob):
+        """Unpack one element's raw bytes into a flat tuple of field values."""
+        if self.elem_struct is not None:
+            vals = self.elem_struct.unpack(blob)
+            perm = self.perm
+            if perm is not None:
+                vals = tuple([vals[p] for p in perm])
+            return vals
+        return tuple([
+            struct.unpack_from(ch, blob, off)[0]
+            for off, ch in zip(self.offsets, self.chars)
+        ])
+
+
+# Tracked indices spanning at most this many elements are fetched with one
+# GetBufferData call per action; sparser sets fall back to one call per index.
+BATCH_READ_MAX_ELEMENTS = 1024
+
+
+def filter_fields(fields, wanted):
+    """Keep fields named in `wanted`, or nested under one of those names."""
+    keep = []
+    for f in fields:
+        name = f.name
+        for w in wanted:
+            if name == w or (name.startswith(w) and name[len(w)] in ".["):
+                keep.append(f)
+                break
+    return keep
+
+
+def plan_reads(indices, stride, elem_size):
+    """
+    Work out once how tracked elements are fetched, since it is the same for
+    every action.
+
+    Returns (slab, offsets). slab is (byte_offset, byte_length) for a single
+    GetBufferData call covering all indices, or None when they are too sparse;
+    offsets is a tuple of (idx, offset), where offset is into the slab, or the
+    buffer offset of the element when reading per index.
+    """
+    if not indices:
+        return None, ()
+    lo = min(indices)
+    hi = max(indices) + 1
+    if (hi - lo) <= BATCH_READ_MAX_ELEMENTS:
+        slab = (lo * stride, (hi - 1 - lo) * stride + elem_size)
+        return slab, tuple((idx, (idx - lo) * stride) for idx in indices)
+    return None, tuple((idx, idx * stride) for idx in indices)
+
+
+def read_elements(controller, buf_id, read_plan, layout):
+    """
+    Read tracked element indices from the buffer at the current replay state.
+
+    Only the first layout.elem_size bytes of each stride are read, so trailing struct
+    padding and unselected tail fields are never fetched.
+
+    Returns {idx: blob} with each element's raw bytes. Values are unpacked
+    by the caller (Layout.unpack) only when the bytes changed.
+    """
     result = {}
-    for idx in indices:
-        base = idx * stride
-        raw = controller.GetBufferData(buf_id, base, stride)
-        if len(raw) < stride:
+    slab, offsets = read_plan
+    elem_size = layout.elem_size
+    if slab is not None:
+        slab_raw = memoryview(controller.GetBufferData(buf_id, slab[0], slab[1]))
+
+    for idx, offset in offsets:
+        if slab is not None:
+            raw = slab_raw
+        else:
+            raw = memoryview(controller.GetBufferData(buf_id, offset, elem_size))
+            offset = 0
+        end = offset + elem_size
+        if len(raw) < end:
             continue
-        vals = []
-        for f in fields:
-            val = struct.unpack_from(f.struct_char, raw, f.byte_offset)
-            vals.append(val[0])
-        result[idx] = tuple(vals)
+        result[idx] = raw[offset:end].tobytes()
     return result
 
 
 def flatten_actions(roots):
-    """Yield every leaf action in linear order."""
-    for action in roots:
-        if len(action.children) > 0:
-            yield from flatten_actions(action.children)
+    """Return every leaf action in linear order (iterative DFS, no recursion)."""
+    out = []
+    stack = list(reversed(roots))
+    while stack:
+        action = stack.pop()
+        children = action.children
+        if len(children) > 0:
+            stack.extend(reversed(children))
         else:
-            yield action
+            out.append(action)
+    return out
 
 
 # ---------------------------------------------------------------------------
@@ -480,8 +653,8 @@ def flatten_actions(roots):
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    with open(REQ_PATH, "r", encoding="utf-8") as f:
-        req = json.load(f)
+    with open(REQ_PATH, "rb") as f:
+        req = _loads(f.read())
 
     buffer_name = req["buffer_name"]
     tracked_indices = req.get("tracked_indices", [0])
@@ -504,47 +677,59 @@ def main() -> None:
         try:
             buf_id = find_buffer(controller, buffer_name)
 
+            actions = flatten_actions(controller.GetRootActions())
+
             # Infer struct layout from shader reflection
-            fields, stride, _schema = infer_layout_from_reflection(controller, buf_id)
+            fields, stride, _schema = infer_layout_from_reflection(controller, buf_id, actions)
+            fields_filter = req.get("fields_filter")
+            if fields_filter:
+                fields = filter_fields(fields, fields_filter)
+                if not fields:
+                    raise RuntimeError(
+                        "fields_filter %s matched no fields of the buffer layout" % fields_filter
+                    )
+
+            layout = Layout(fields)
+            nest_plan = build_insertion_plan(layout.paths)
+            read_plan = plan_reads(tracked_indices, stride, layout.elem_size)
 
-            # Scan all actions
-            actions = list(flatten_actions(controller.GetRootActions()))
             if not actions:
                 raise RuntimeError("No actions found in capture")
 
             # Track data changes
             element_initial = {}
             element_changes = {idx: [] for idx in tracked_indices}
-            last_nested = {}
             last_seen = {}
             total_changes = 0
 
             for action in actions:
                 eid = action.eventId
                 controller.SetFrameEvent(eid, False)
-                current = read_elements(controller, buf_id, tracked_indices, fields, stride)
+                current = read_elements(
+                    controller, buf_id, read_plan, layout
+                )
 
                 for idx in tracked_indices:
-                    vals = current.get(idx)
-                    if vals is None:
+                    blob = current.get(idx)
+                    if blob is None:
                         continue
                     prev = last_seen.get(idx)
-                    if prev is None or vals != prev:
-                        nested = build_nested(fields, vals)
-
-                        if idx not in element_initial:
-                            element_initial[idx] = (eid, nested)
-                        else:
-                            delta = diff_nested(last_nested[idx], nested)
-                            if delta is not None:
-                                element_changes[idx].append({
-                                    "event_id": eid,
-                                    "delta": delta,
-                                })
-                                total_changes += 1
-
-                        last_nested[idx] = nested
-                        last_seen[idx] = vals
+                    if prev is None:
+                        vals = layout.unpack(blob)
+                        element_initial[idx] = (eid, build_nested(nest_plan, vals))
+                        last_seen[idx] = (blob, vals)
+                    elif blob != prev[0]:
+                        # Raw bytes differ (a single memcmp); only now unpack
+                        # and diff the flat value tuples
+                        vals = layout.unpack(blob)
+                        delta = build_delta(prev[1], vals)
+                        if delta is not None:
+                            element_changes[idx].append({
+                                "event_id": eid,
+                                "delta": delta,
+                            })
+                            total_changes += 1
+                        last_seen[idx] = (blob, vals)
 
             # Build elements array
             elements = []
@@ -562,6 +747,10 @@ def main() -> None:
             # Build final document
             document = {
                 "tracked_indices": list(tracked_indices),
+                "fields": [
+                    {"id": i, "name": name, "type": type_name}
+                    for i, (name, type_name) in enumerate(zip(layout.names, layout.type_names))
+                ],
                 "total_changes": total_changes,
                 "elements": elements,
             }
@@ -8,123 +8,106 @@ Returns:
   - buffer_name: The name of the buffer
   - schema: Type description of the buffer struct fields
   - stride: Byte stride per element
+  - struct_format: Python struct format for one element (null if fields overlap)
+  - dtype: NumPy structured dtype spec for one element ({names, formats, offsets, itemsize})
   - usages: List of pipelines/bindings that use this buffer
+
+Request parameters:
+  - capture_path: Path to the RenderDoc capture file (required)
+  - buffer_name: Name of the buffer (required)
+  - event_id_min / event_id_max: Optional inclusive event range to scan; disjoint
+                                 ranges can be run as separate processes and their
+                                 usages merged by (pipeline, descriptor_set, binding)
+  - compact_event_ids: If true, each usage reports event_ranges ([[start, count], ...]
+                       runs of consecutive event IDs) instead of event_ids
 """
 
 import struct
 import json
 import traceback
+from collections import defaultdict
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 
 REQ_PATH = "get_buffer_details_json.request.json"
 RESP_PATH = "get_buffer_details_json.response.json"
 
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
 
 
 # ---------------------------------------------------------------------------
 # Struct layout inference from shader reflection
 # ---------------------------------------------------------------------------
 
-def vartype_to_struct_char(vartype):
-    """Map a renderdoc VarType enum to a Python struct format character."""
-    mapping = {
-        rd.VarType.Float:  'f',
-        rd.VarType.Half:   'e',
-        rd.VarType.Double: 'd',
-        rd.VarType.SInt:   'i',
-        rd.VarType.UInt:   'I',
-        rd.VarType.SShort: 'h',
-        rd.VarType.UShort: 'H',
-        rd.VarType.SByte:  'b',
-        rd.VarType.UByte:  'B',
-        rd.VarType.SLong:  'q',
-        rd.VarType.ULong:  'Q',
-        rd.VarType.Bool:   'I',
-    }
-    return mapping.get(vartype, None)
-
-
-def vartype_byte_size(vartype):
-    """Byte size of a single scalar for the given VarType."""
-    sizes = {
-        rd.VarType.Float:  4,
-        rd.VarType.Half:   2,
-        rd.VarType.Double: 8,
-        rd.VarType.SInt:   4,
-        rd.VarType.UInt:   4,
-        rd.VarType.SShort: 2,
-        rd.VarType.UShort: 2,
-        rd.VarType.SByte:  1,
-        rd.VarType.UByte:  1,
-        rd.VarType.SLong:  8,
-        rd.VarType.ULong:  8,
-        rd.VarType.Bool:   4,
-    }
-    return sizes.get(vartype, 4)
-
-
-def vartype_to_name(vartype):
-    """Map a renderdoc VarType to a human-readable GLSL-style type name."""
-    names = {
-        rd.VarType.Float:  'float',
-        rd.VarType.Half:   'half',
-        rd.VarType.Double: 'double',
-        rd.VarType.SInt:   'int',
-        rd.VarType.UInt:   'uint',
-        rd.VarType.SShort: 'short',
-        rd.VarType.UShort: 'ushort',
-        rd.VarType.SByte:  'sbyte',
-        rd.VarType.UByte:  'ubyte',
-        rd.VarType.SLong:  'int64',
-        rd.VarType.ULong:  'uint64',
-        rd.VarType.Bool:   'bool',
-    }
-    return names.get(vartype, 'unknown')
+# VarType -> (struct format char, scalar byte size, GLSL-style type name)
+VARTYPE_INFO = {
+    rd.VarType.Float:  ('f', 4, 'float'),
+    rd.VarType.Half:   ('e', 2, 'half'),
+    rd.VarType.Double: ('d', 8, 'double'),
+    rd.VarType.SInt:   ('i', 4, 'int'),
+    rd.VarType.UInt:   ('I', 4, 'uint'),
+    rd.VarType.SShort: ('h', 2, 'short'),
+    rd.VarType.UShort: ('H', 2, 'ushort'),
+    rd.VarType.SByte:  ('b', 1, 'sbyte'),
+    rd.VarType.UByte:  ('B', 1, 'ubyte'),
+    rd.VarType.SLong:  ('q', 8, 'int64'),
+    rd.VarType.ULong:  ('Q', 8, 'uint64'),
+    rd.VarType.Bool:   ('I', 4, 'bool'),
+}
+UNKNOWN_VARTYPE_INFO = (None, 4, 'unknown')
+
+
+def vartype_info(vartype):
+    """Return (struct_char, byte_size, type_name) for a renderdoc VarType in one lookup."""
+    return VARTYPE_INFO.get(vartype, UNKNOWN_VARTYPE_INFO)
 
 
 def build_type_schema(members):
     """Build a concise type-description tree from a list of ShaderConstant members."""
-    schema = {}
-    for const in members:
-        ctype = const.type
-
-        if len(ctype.members) > 0:
-            inner = build_type_schema(ctype.members)
-            arr_count = max(ctype.elements, 1)
-            if arr_count > 1:
-                schema[const.name] = {"_array": arr_count, "_element": inner}
-            else:
-                schema[const.name] = inner
-            continue
+    return {const.name: describe_type(const.type) for const in members}
 
-        base_name = vartype_to_name(ctype.baseType)
-        rows = max(ctype.rows, 1)
-        cols = max(ctype.columns, 1)
-        arr_count = max(ctype.elements, 1)
 
-        if rows > 1 and cols > 1:
-            core = "%s[%d][%d]" % (base_name, rows, cols)
-        elif rows == 1 and cols > 1:
-            core = "%s[%d]" % (base_name, cols)
-        elif rows > 1 and cols == 1:
-            core = "%s[%d]" % (base_name, rows)
-        else:
-            core = base_name
+def describe_type(ctype):
+    """Describe one ShaderConstantType: a nested schema for structs, a type string otherwise."""
+    # Each attribute read on a reflection object crosses into native code;
+    # read them once up front.
+    members = ctype.members
+    arr_count = max(ctype.elements, 1)
 
+    if len(members) > 0:
+        inner = build_type_schema(members)
         if arr_count > 1:
-            type_str = "%s[%d]" % (core, arr_count) if core == base_name else "%s x %d" % (core, arr_count)
-        else:
-            type_str = core
+            return {"_array": arr_count, "_element": inner}
+        return inner
+
+    base_name = vartype_info(ctype.baseType)[2]
+    rows = max(ctype.rows, 1)
+    cols = max(ctype.columns, 1)
 
-        schema[const.name] = type_str
+    if rows > 1 and cols > 1:
+        core = "%s[%d][%d]" % (base_name, rows, cols)
+    elif cols > 1:
+        core = "%s[%d]" % (base_name, cols)
+    elif rows > 1:
+        core = "%s[%d]" % (base_name, rows)
+    else:
+        return "%s[%d]" % (base_name, arr_count) if arr_count > 1 else base_name
 
-    return schema
+    return "%s x %d" % (core, arr_count) if arr_count > 1 else core
 
 
 class FieldDef:
@@ -138,26 +121,48 @@ class FieldDef:
 
 
 def flatten_constant_type(prefix, const, base_offset):
-    """Recursively flatten a ShaderConstant into a list of FieldDef."""
+    """
+    Recursively flatten a ShaderConstant into a list of FieldDef.
+
+    Returns (fields, last_offset, last_size) where last_offset/last_size describe
+    the field at the highest byte offset (-1/0 if there are no fields), tracked
+    as fields are produced so callers don't need another pass to find it.
+    """
     ctype = const.type
     abs_offset = base_offset + const.byteOffset
-    field_name = ("%s.%s" % (prefix, const.name)) if prefix else const.name
+    field_name = f"{prefix}.{const.name}" if prefix else const.name
 
     if len(ctype.members) > 0:
-        fields = []
+        # Flatten one element relative to offset 0, then stamp it out for every
+        # array element; arrays of structs share a single shape.
+        template = []
+        last_offset = -1
+        last_size = 0
+        for member in ctype.members:
+            sub, sub_offset, sub_size = flatten_constant_type("", member, 0)
+            template.extend([(f.name, f.byte_offset, f.struct_char) for f in sub])
+            if sub_offset > last_offset:
+                last_offset = sub_offset
+                last_size = sub_size
+        if not template:
+            return [], -1, 0
+
         arr_count = max(ctype.elements, 1)
+        arr_stride = ctype.arrayByteStride if arr_count > 1 else 0
+        fields = []
         for arr_i in range(arr_count):
-            arr_prefix = ("%s[%d]" % (field_name, arr_i)) if arr_count > 1 else field_name
-            elem_offset = abs_offset + arr_i * ctype.arrayByteStride if arr_count > 1 else abs_offset
-            for member in ctype.members:
-                fields.extend(flatten_constant_type(arr_prefix, member, elem_offset))
-        return fields
-
-    char = vartype_to_struct_char(ctype.baseType)
+            arr_prefix = f"{field_name}[{arr_i}]." if arr_count > 1 else field_name + "."
+            elem_offset = abs_offset + arr_i * arr_stride
+            fields.extend([
+                FieldDef(arr_prefix + name, elem_offset + rel_offset, char)
+                for name, rel_offset, char in template
+            ])
+        return fields, abs_offset + (arr_count - 1) * arr_stride + last_offset, last_size
+
+    char, scalar_size, _ = vartype_info(ctype.baseType)
     if char is None:
-        return []
+        return [], -1, 0
 
-    scalar_size = vartype_byte_size(ctype.baseType)
     fields = []
 
     arr_count = max(ctype.elements, 1)
@@ -166,7 +171,7 @@ def flatten_constant_type(prefix, const, base_offset):
     total_scalars = rows * cols
 
     for arr_i in range(arr_count):
-        arr_name = ("%s[%d]" % (field_name, arr_i)) if arr_count > 1 else field_name
+        arr_name = f"{field_name}[{arr_i}]" if arr_count > 1 else field_name
 
         if arr_count > 1:
             elem_base = abs_offset + arr_i * ctype.arrayByteStride
@@ -175,68 +180,71 @@ def flatten_constant_type(prefix, const, base_offset):
 
         if total_scalars == 1:
             fields.append(FieldDef(arr_name, elem_base, char))
-        else:
+        elif rows > 1 and cols > 1:
             for r in range(rows):
+                row_name = f"{arr_name}[{r}]"
+                row_base = elem_base + r * cols * scalar_size
                 for c in range(cols):
-                    comp_idx = r * cols + c
-                    if rows > 1 and cols > 1:
-                        comp_name = "%s[%d][%d]" % (arr_name, r, c)
-                    else:
-                        comp_name = "%s[%d]" % (arr_name, comp_idx)
-                    comp_offset = elem_base + comp_idx * scalar_size
-                    fields.append(FieldDef(comp_name, comp_offset, char))
-
-    return fields
-
-
-def leaves(roots):
-    for a in roots:
-        if len(a.children) > 0:
-            yield from leaves(a.children)
+                    fields.append(FieldDef(f"{row_name}[{c}]", row_base + c * scalar_size, char))
         else:
-            yield a
-
-
-def infer_layout_from_reflection(controller, buf_id):
-    """Find a shader that references buf_id and extract the struct layout."""
-    actions = list(leaves(controller.GetRootActions()))
-    stages_to_check = [
-        rd.ShaderStage.Compute,
-        rd.ShaderStage.Vertex,
-        rd.ShaderStage.Fragment,
-        rd.ShaderStage.Geometry,
-        rd.ShaderStage.Tess_Eval,
-        rd.ShaderStage.Tess_Control,
-    ]
-
-    for action in actions:
-        controller.SetFrameEvent(action.eventId, False)
-        state = controller.GetPipelineState()
-
-        for stage in stages_to_check:
-            refl = state.GetShaderReflection(stage)
-            if refl is None:
-                continue
-
-            rw_list = state.GetReadWriteResources(stage)
-            for i, used in enumerate(rw_list):
-                if used.descriptor.resource == buf_id:
-                    if i < len(refl.readWriteResources):
-                        res = refl.readWriteResources[i]
-                        return extract_fields_from_resource(res)
-
-            ro_list = state.GetReadOnlyResources(stage)
-            for i, used in enumerate(ro_list):
-                if used.descriptor.resource == buf_id:
-                    if i < len(refl.readOnlyResources):
-                        res = refl.readOnlyResources[i]
-                        return extract_fields_from_resource(res)
-
-    raise RuntimeError(
-        "Could not find any shader that references the target buffer. "
-        "Make sure the buffer name is correct and the buffer is used "
-        "in at least one dispatch or draw in the capture."
-    )
+            for comp_idx in range(total_scalars):
+                comp_offset = elem_base + comp_idx * scalar_size
+                fields.append(FieldDef(f"{arr_name}[{comp_idx}]", comp_offset, char))
+
+    # Scalars are emitted in increasing offset order
+    return fields, fields[-1].byte_offset, scalar_size
+
+
+def build_row_format(fields, stride):
+    """
+    Build one little-endian struct format string covering a whole element.
+
+    Fields are laid out in byte_offset order with 'x' padding for gaps and for
+    the tail up to stride, so struct.Struct(fmt).iter_unpack(data) decodes a
+    buffer of elements in a single C loop. Returns None if fields overlap or
+    run past stride.
+    """
+    fmt = ["<"]
+    pos = 0
+    for f in sorted(fields, key=lambda f: f.byte_offset):
+        gap = f.byte_offset - pos
+        if gap < 0:
+            return None
+        if gap:
+            fmt.append("%dx" % gap)
+        fmt.append(f.struct_char)
+        pos = f.byte_offset + struct.calcsize(f.struct_char)
+    if pos > stride:
+        return None
+    if pos < stride:
+        fmt.append("%dx" % (stride - pos))
+    return "".join(fmt)
+
+
+# struct format char -> NumPy array-protocol type string
+STRUCT_CHAR_TO_DTYPE = {
+    'f': '<f4', 'e': '<f2', 'd': '<f8',
+    'i': '<i4', 'I': '<u4',
+    'h': '<i2', 'H': '<u2',
+    'b': 'i1', 'B': 'u1',
+    'q': '<i8', 'Q': '<u8',
+}
+
+
+def build_dtype_descr(fields, stride):
+    """
+    Describe an element as a NumPy structured dtype spec.
+
+    The result is plain JSON ({names, formats, offsets, itemsize}) so NumPy is
+    not needed here; a consumer passes it to numpy.dtype() and can then wrap
+    raw buffer bytes with numpy.frombuffer(data, dtype) without copying.
+    """
+    return {
+        "names": [f.name for f in fields],
+        "formats": [STRUCT_CHAR_TO_DTYPE[f.struct_char] for f in fields],
+        "offsets": [f.byte_offset for f in fields],
+        "itemsize": stride,
+    }
 
 
 def extract_fields_from_resource(shader_res):
@@ -256,14 +264,19 @@ def extract_fields_from_resource(shader_res):
         members = inner.type.members
 
     fields = []
+    last_offset = -1
+    last_size = 0
     for member in members:
-        fields.extend(flatten_constant_type("", member, 0))
+        sub, sub_offset, sub_size = flatten_constant_type("", member, 0)
+        fields.extend(sub)
+        if sub_offset > last_offset:
+            last_offset = sub_offset
+            last_size = sub_size
 
     if not fields:
         raise RuntimeError("Failed to extract any fields from the struct layout.")
 
-    last = max(fields, key=lambda f: f.byte_offset)
-    stride = last.byte_offset + struct.calcsize(last.struct_char)
+    stride = last_offset + last_size
 
     if var_type.arrayByteStride > 0:
         stride = var_type.arrayByteStride
@@ -273,62 +286,139 @@ def extract_fields_from_resource(shader_res):
 
     schema = build_type_schema(members)
 
-    return fields, stride, schema
+    row_format = build_row_format(fields, stride)
+    dtype = build_dtype_descr(fields, stride)
+
+    return fields, stride, schema, row_format, dtype
 
 
 # ---------------------------------------------------------------------------
 # Buffer finding
 # ---------------------------------------------------------------------------
 
-def find_buffer(controller, buffer_name):
-    """Locate the target buffer's ResourceId by name."""
-    for res in controller.GetResources():
-        if res.name == buffer_name:
-            return res.resourceId
-
-    available = []
-    for r in controller.GetResources():
-        if r.type == rd.ResourceType.Buffer:
-            available.append("  %s  %s" % (r.resourceId, r.name))
-
+def find_buffer(resources, buffer_name):
+    """
+    Locate the target buffer's ResourceId by name.
+
+    Takes the capture's resource list (fetched once by the caller) and indexes
+    it in a single pass; the first resource with a given name wins.
+    """
+    id_by_name = {}
+    buffers = []
+    for res in resources:
+        id_by_name.setdefault(res.name, res.resourceId)
+        if res.type == rd.ResourceType.Buffer:
+            buffers.append(res)
+
+    buf_id = id_by_name.get(buffer_name)
+    if buf_id is not None:
+        return buf_id
+
+    available = ["  %s  %s" % (r.resourceId, r.name) for r in buffers[:20]]
     raise RuntimeError(
         "Buffer '%s' not found. Available buffers:\n%s"
-        % (buffer_name, "\n".join(available[:20]))
+        % (buffer_name, "\n".join(available))
+    )
+
+
+def is_drawcall_like(flags: int) -> bool:
+    return bool(
+        (flags & rd.ActionFlags.Drawcall)
+        or (flags & rd.ActionFlags.Dispatch)
+        or (flags & rd.ActionFlags.MeshDispatch)
+        or (flags & rd.ActionFlags.DispatchRay)
     )
 
 
 def flatten_actions(roots):
-    """Yield every leaf action in linear order."""
-    for action in roots:
-        if len(action.children) > 0:
-            yield from flatten_actions(action.children)
+    """Return every leaf action in linear order (iterative DFS, no recursion)."""
+    out = []
+    stack = list(reversed(roots))
+    while stack:
+        action = stack.pop()
+        children = action.children
+        if len(children) > 0:
+            stack.extend(reversed(children))
         else:
-            yield action
+            out.append(action)
+    return out
 
 
 # ---------------------------------------------------------------------------
 # Buffer usage collection
 # ---------------------------------------------------------------------------
 
-def collect_buffer_usages(controller, buf_id, actions):
-    """Scan every leaf action and record each time the buffer appears in a shader binding."""
-    stages = [
-        rd.ShaderStage.Compute,
-        rd.ShaderStage.Vertex,
-        rd.ShaderStage.Fragment,
-        rd.ShaderStage.Geometry,
-        rd.ShaderStage.Tess_Eval,
-        rd.ShaderStage.Tess_Control,
-    ]
+# A dispatch only has a compute shader bound and a draw never does, so each
+# action only needs the reflection of its own pipeline type's stages.
+COMPUTE_STAGES = (rd.ShaderStage.Compute,)
+GRAPHICS_STAGES = (
+    rd.ShaderStage.Vertex,
+    rd.ShaderStage.Fragment,
+    rd.ShaderStage.Geometry,
+    rd.ShaderStage.Tess_Eval,
+    rd.ShaderStage.Tess_Control,
+)
+
+
+def indices_of(ids, target):
+    """Every position of target in ids, located with C-level list.index."""
+    out = []
+    i = -1
+    try:
+        while True:
+            i = ids.index(target, i + 1)
+            out.append(i)
+    except ValueError:
+        pass
+    return out
+
+
+def reflection_declares_buffer(cache, shader_id, is_rw, refl_list):
+    """Whether a shader's RW/RO reflection list declares any buffer, memoized per shader."""
+    key = (shader_id, is_rw)
+    found = cache.get(key)
+    if found is None:
+        found = False
+        for res in refl_list:
+            try:
+                if not res.isTexture:
+                    found = True
+                    break
+            except Exception:
+                found = True
+                break
+        cache[key] = found
+    return found
+
+
+def event_id_ranges(eids):
+    """Run-length encode sorted event IDs as [[start, count], ...]."""
+    ranges = []
+    for eid in eids:
+        if ranges:
+            last = ranges[-1]
+            if last[0] + last[1] == eid:
+                last[1] += 1
+                continue
+        ranges.append([eid, 1])
+    return ranges
 
+
+def scan_actions(controller, buf_id, actions, resource_names):
+    """
+    Scan every leaf action once, recording each time the buffer appears in a
+    shader binding and inferring the struct layout from the first binding whose
+    reflection describes a struct.
+
+    resource_names maps int(ResourceId) -> name for the whole capture, built once
+    by the caller so name lookups never go back through GetResources().
+
+    Returns (usages, layout) where layout is the tuple returned by
+    extract_fields_from_resource.
+    Raises if no binding references the buffer or none of them yields a layout.
+    """
     def get_name(rid):
-        try:
-            for r in controller.GetResources():
-                if r.resourceId == rid:
-                    return r.name
-        except Exception:
-            pass
-        return str(rid)
+        return resource_names.get(int(rid), str(rid))
 
     def binding_type_str(refl_res, is_rw):
         try:
@@ -339,9 +429,54 @@ def collect_buffer_usages(controller, buf_id, actions):
         prefix = "RW " if is_rw else ""
         return prefix + "Buffer" if is_buffer else prefix + "Resource"
 
-    groups = {}
+    # (pipeline_name, ds_name, binding_index, is_rw) -> usage group; static
+    # fields are filled in the first time a group is hit.
+    groups = defaultdict(lambda: {
+        "pipeline": None,
+        "descriptor_set": None,
+        "binding_name": "",
+        "binding_index": -1,
+        "type_str": "",
+        "event_ids": [],
+    })
+    # (shader_id, stage, is_rw, refl_idx) -> (binding_name, binding_index, type_str).
+    # The metadata comes from the reflection that owns the slot, so it is keyed
+    # by that shader rather than by pipe_id, which for a dispatch is still the
+    # last bound graphics pipeline. The bound resources themselves are still
+    # checked on every action.
+    binding_info = {}
+    # (shader_id, is_rw) -> whether that reflection list declares any buffer.
+    # A stage whose shader only declares textures can never bind buf_id, so
+    # its bound-resource list isn't fetched at all.
+    declares_buffer = {}
+    # (pipeline_id, is_compute) -> [(stage, refl, shader_id, refl_rw, refl_ro)].
+    # A pipeline object fixes its shaders, so the reflection objects and their
+    # resource lists are fetched once per pipeline instead of once per action.
+    # Only this cache keys dispatches on the compute pipeline; the reported
+    # pipeline name and usage groups still come from the graphics pipeline
+    # object. APIs without pipeline objects report Null and are queried
+    # every time.
+    stage_cache = {}
+    layout = None
+    layout_error = None
+
+    def try_layout(refl_res):
+        nonlocal layout, layout_error
+        try:
+            layout = extract_fields_from_resource(refl_res)
+        except RuntimeError as e:
+            # Keep scanning; a later binding may carry the struct type
+            if layout_error is None:
+                layout_error = e
 
     for action in actions:
+        # Clears, copies and markers have no shader bindings; don't pay for
+        # a SetFrameEvent on them
+        flags = action.flags
+        if not is_drawcall_like(flags):
+            continue
+        is_compute = bool(flags & rd.ActionFlags.Dispatch)
+        stages = COMPUTE_STAGES if is_compute else GRAPHICS_STAGES
         eid = action.eventId
         controller.SetFrameEvent(eid, False)
         state = controller.GetPipelineState()
@@ -351,32 +486,90 @@ def collect_buffer_usages(controller, buf_id, actions):
         except Exception:
             pipe_id = rd.ResourceId.Null()
 
-        if pipe_id == rd.ResourceId.Null():
-            for s in stages:
-                try:
-                    r = state.GetShaderReflection(s)
-                    if r is not None:
-                        pipe_id = r.resourceId
-                        break
-                except Exception:
+        try:
+            if is_compute:
+                cache_pipe = state.GetComputePipelineObject()
+            else:
+                cache_pipe = pipe_id
+        except Exception:
+            cache_pipe = rd.ResourceId.Null()
+        cache_key = None
+        if cache_pipe != rd.ResourceId.Null():
+            cache_key = (int(cache_pipe), is_compute)
+
+        active_stages = stage_cache.get(cache_key) if cache_key is not None else None
+        if active_stages is None:
+            # Fetch each stage's reflection once and keep only the stages that
+            # actually have a shader bound.
+            active_stages = []
+            for stage in stages:
+                refl = state.GetShaderReflection(stage)
+                if refl is not None:
+                    active_stages.append((
+                        stage, refl, int(refl.resourceId),
+                        refl.readWriteResources, refl.readOnlyResources,
+                    ))
+            if cache_key is not None:
+                stage_cache[cache_key] = active_stages
+
+        if pipe_id == rd.ResourceId.Null() and active_stages:
+            pipe_id = active_stages[0][1].resourceId
+        pipe_name = get_name(pipe_id) if pipe_id != rd.ResourceId.Null() else ""
+
+        for stage, refl, shader_id, refl_rw, refl_ro in active_stages:
+            for is_rw, refl_list in ((True, refl_rw), (False, refl_ro)):
+                if not reflection_declares_buffer(declares_buffer, shader_id, is_rw, refl_list):
                     continue
 
-        for stage in stages:
-            refl = state.GetShaderReflection(stage)
-            if refl is None:
-                continue
-
-            rw_list = state.GetReadWriteResources(stage)
-            for i, used in enumerate(rw_list):
-                if used.descriptor.resource == buf_id:
-                    record_usage(groups, eid, pipe_id, used, refl, i, True,
-                                refl.readWriteResources, get_name, binding_type_str)
-
-            ro_list = state.GetReadOnlyResources(stage)
-            for i, used in enumerate(ro_list):
-                if used.descriptor.resource == buf_id:
-                    record_usage(groups, eid, pipe_id, used, refl, i, False,
-                                refl.readOnlyResources, get_name, binding_type_str)
+                # Pull the bound IDs out once; most stages don't bind the buffer
+                # at all, so list.index finds matches without a per-slot Python loop.
+                if is_rw:
+                    used_list = state.GetReadWriteResources(stage)
+                else:
+                    used_list = state.GetReadOnlyResources(stage)
+                used_ids = [used.descriptor.resource for used in used_list]
+
+                for i in indices_of(used_ids, buf_id):
+                    if layout is None and i < len(refl_list):
+                        try_layout(refl_list[i])
+
+                    try:
+                        ds_id = used_list[i].access.descriptorStore
+                    except Exception:
+                        ds_id = rd.ResourceId.Null()
+
+                    info_key = (shader_id, int(stage), is_rw, i)
+                    info = binding_info.get(info_key)
+                    if info is None:
+                        bname = ""
+                        bindex = i
+                        refl_res = None
+                        if i < len(refl_list):
+                            refl_res = refl_list[i]
+                            bname = refl_res.name
+                            try:
+                                bindex = refl_res.fixedBindNumber
+                            except Exception:
+                                bindex = i
+                        if refl_res:
+                            type_str = binding_type_str(refl_res, is_rw)
+                        else:
+                            type_str = "RW Buffer" if is_rw else "Buffer"
+                        info = binding_info[info_key] = (bname, bindex, type_str)
+                    bname, bindex, type_str = info
+
+                    ds_name = get_name(ds_id) if ds_id != rd.ResourceId.Null() else ""
+                    g = groups[(pipe_name, ds_name, bindex, is_rw)]
+                    if g["pipeline"] is None:
+                        g["pipeline"] = pipe_name
+                        g["descriptor_set"] = ds_name
+                        g["binding_name"] = bname
+                        g["binding_index"] = bindex
+                        g["type_str"] = type_str
+
+                    eids = g["event_ids"]
+                    if not eids or eids[-1] != eid:
+                        eids.append(eid)
 
     result = []
     for key, g in sorted(groups.items(), key=lambda kv: kv[1]["event_ids"][0]):
@@ -391,47 +584,16 @@ def collect_buffer_usages(controller, buf_id, actions):
             "event_ids": g["event_ids"],
         })
 
-    return result
-
-
-def record_usage(groups, eid, pipe_id, used, refl, refl_idx, is_rw,
-                 refl_list, get_name, binding_type_str):
-    """Record a single buffer usage into the groups accumulator."""
-    try:
-        ds_id = used.access.descriptorStore
-    except Exception:
-        ds_id = rd.ResourceId.Null()
-
-    bname = ""
-    bindex = refl_idx
-    refl_res = None
-    if refl_idx < len(refl_list):
-        refl_res = refl_list[refl_idx]
-        bname = refl_res.name
-        try:
-            bindex = refl_res.fixedBindNumber
-        except Exception:
-            bindex = refl_idx
-
-    type_str = binding_type_str(refl_res, is_rw) if refl_res else ("RW Buffer" if is_rw else "Buffer")
-
-    pipe_name = get_name(pipe_id) if pipe_id != rd.ResourceId.Null() else ""
-    ds_name = get_name(ds_id) if ds_id != rd.ResourceId.Null() else ""
-    key = (pipe_name, ds_name, bindex, is_rw)
-
-    if key not in groups:
-        groups[key] = {
-            "pipeline": pipe_name,
-            "descriptor_set": ds_name,
-            "binding_name": bname,
-            "binding_index": bindex,
-            "type_str": type_str,
-            "event_ids": [],
-        }
+    if layout is None:
+        if layout_error is not None:
+            raise layout_error
+        raise RuntimeError(
+            "Could not find any shader that references the target buffer. "
+            "Make sure the buffer name is correct and the buffer is used "
+            "in at least one dispatch or draw in the capture."
+        )
 
-    eids = groups[key]["event_ids"]
-    if not eids or eids[-1] != eid:
-        eids.append(eid)
+    return result, layout
 
 
 # ---------------------------------------------------------------------------
@@ -460,27 +622,46 @@ def main() -> None:
             raise RuntimeError("Couldn't initialise replay: " + str(result))
 
         try:
-            buf_id = find_buffer(controller, buffer_name)
+            resources = controller.GetResources()
+            buf_id = find_buffer(resources, buffer_name)
 
-            # Infer struct layout from shader reflection
-            fields, stride, schema = infer_layout_from_reflection(controller, buf_id)
+            # Build a lookup dict for resource names
+            resource_names = {}
+            for res in resources:
+                resource_names[int(res.resourceId)] = res.name
 
             # Scan all actions
-            actions = list(flatten_actions(controller.GetRootActions()))
+            actions = flatten_actions(controller.GetRootActions())
             if not actions:
                 raise RuntimeError("No actions found in capture")
 
-            # Collect buffer usage across all actions
-            usages = collect_buffer_usages(controller, buf_id, actions)
+            event_id_min = req.get("event_id_min", None)
+            event_id_max = req.get("event_id_max", None)
+            if event_id_min is not None or event_id_max is not None:
+                lo = event_id_min if event_id_min is not None else 0
+                hi = event_id_max if event_id_max is not None else actions[-1].eventId
+                actions = [a for a in actions if lo <= a.eventId <= hi]
+
+            # Collect buffer usage and infer the struct layout from shader
+            # reflection in a single pass over the actions
+            usages, (fields, stride, schema, row_format, dtype) = scan_actions(
+                controller, buf_id, actions, resource_names
+            )
 
             # Build final document
             document = {
                 "buffer_name": buffer_name,
                 "schema": schema,
                 "stride": stride,
+                "struct_format": row_format,
+                "dtype": dtype,
                 "usages": usages,
             }
 
+            if req.get("compact_event_ids", False):
+                for usage in usages:
+                    usage["event_ranges"] = event_id_ranges(usage.pop("event_ids"))
+
             write_envelope(True, result=document)
         finally:
             try:
@@ -12,134 +12,252 @@ Outputs a JSON object with:
 """
 
 import json
-import traceback
-from collections import defaultdict
+import os
+from collections import namedtuple
+from operator import attrgetter, methodcaller
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data.decode("utf-8"))
+
 
 REQ_PATH = "get_event_pipeline_state_json.request.json"
 RESP_PATH = "get_event_pipeline_state_json.response.json"
 
+# The streamed response is written as many small fragments; buffer them in
+# large blocks rather than the default 8 KiB.
+RESP_WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
+
+
+def write_streamed_envelope(header, sections) -> None:
+    """
+    Write a successful envelope whose result is header plus one JSON list per
+    (key, items) section, serializing each item as it is produced so the full
+    result never has to be held in memory at once.
+    """
+    with open(RESP_PATH, "wb", buffering=RESP_WRITE_BUFFER_SIZE) as f:
+        f.write(b'{"ok":true,"error":null,"result":')
+        f.write(_dumps(header)[:-1])
+        sep = b"," if header else b""
+        for key, items in sections:
+            f.write(sep)
+            sep = b","
+            f.write(_dumps(key))
+            f.write(b":[")
+            item_sep = b""
+            for item in items:
+                f.write(item_sep)
+                item_sep = b","
+                f.write(_dumps(item))
+            f.write(b"]")
+        f.write(b"}}")
 
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def _resource_name(res_id, controller):
+def _build_lookups(controller, include_buffer_sizes=True):
+    """
+    Index resource names, buffer lengths and textures by int(ResourceId).
+    Only named resources get a name entry; buffer lengths are left empty
+    when include_buffer_sizes is false.
+    """
+    resource_names = {}
+    for r in controller.GetResources():
+        if r.name:
+            resource_names[int(r.resourceId)] = r.name
+
+    buffer_sizes = {}
+    if include_buffer_sizes:
+        for b in controller.GetBuffers():
+            buffer_sizes[int(b.resourceId)] = b.length
+
+    textures = {}
+    try:
+        for t in controller.GetTextures():
+            textures[int(t.resourceId)] = t
+    except Exception:
+        pass
+
+    return resource_names, buffer_sizes, textures
+
+
+# str(ResourceId) per int(ResourceId); the same ids recur across sections.
+_RID_STR_CACHE = {}
+
+
+def _rid_str(res_id):
+    """Memoized str(res_id)."""
+    key = int(res_id)
+    text = _RID_STR_CACHE.get(key)
+    if text is None:
+        text = str(res_id)
+        _RID_STR_CACHE[key] = text
+    return text
+
+
+# str(enum) per (enum type, value). The type is part of the key because
+# RenderDoc enums are int-valued, so members of different enums compare equal.
+_ENUM_STR_CACHE = {}
+
+
+def _enum_str(value):
+    """Memoized str() for RenderDoc enum values."""
+    key = (type(value), value)
+    text = _ENUM_STR_CACHE.get(key)
+    if text is None:
+        text = str(value)
+        _ENUM_STR_CACHE[key] = text
+    return text
+
+
+def _resource_name(res_id, resource_names):
     """Get the debug name for a resource."""
     if res_id == rd.ResourceId.Null():
         return "<null>"
-    for r in controller.GetResources():
-        if r.resourceId == res_id:
-            return r.name if r.name else str(res_id)
-    return str(res_id)
+    return resource_names.get(int(res_id)) or _rid_str(res_id)
 
 
-def _buf_size_for_resource(res_id, controller):
+def _buf_size_for_resource(res_id, buffer_sizes):
     """Try to find the buffer's total byte length."""
-    for b in controller.GetBuffers():
-        if b.resourceId == res_id:
-            return b.length
-    return None
-
-
-def _shader_var_to_dict(v):
-    """Recursively convert a ShaderVariable to a JSON-friendly dict."""
-    if len(v.members) > 0:
-        return {
-            "name": v.name,
-            "members": [_shader_var_to_dict(m) for m in v.members],
-        }
+    return buffer_sizes.get(int(res_id))
+
+
+# Which ShaderValue array backs each VarType; anything unlisted reads as f32v.
+_VARTYPE_VALUE_ATTR = {
+    rd.VarType.Float:  "f32v",
+    rd.VarType.Half:   "f32v",
+    rd.VarType.Double: "f64v",
+    rd.VarType.SInt:   "s32v",
+    rd.VarType.SShort: "s32v",
+    rd.VarType.SByte:  "s32v",
+    rd.VarType.UInt:   "u32v",
+    rd.VarType.UShort: "u32v",
+    rd.VarType.UByte:  "u32v",
+    rd.VarType.Bool:   "u32v",
+    rd.VarType.SLong:  "s64v",
+    rd.VarType.ULong:  "u64v",
+}
+
+
+def _shader_var_to_dict(root):
+    """
+    Convert a ShaderVariable tree to JSON-friendly dicts.
+
+    Walks the tree with an explicit stack, filling each output dict in place,
+    so a large constant buffer costs one loop iteration per variable instead
+    of one Python call frame per variable.
+    """
+    value_attr = _VARTYPE_VALUE_ATTR.get
+    out = {}
+    stack = [(root, out)]
+    while stack:
+        v, d = stack.pop()
+        d["name"] = v.name
+
+        members = v.members
+        if len(members) > 0:
+            children = [{} for _ in members]
+            d["members"] = children
+            stack.extend(zip(members, children))
+            continue
 
-    rows = max(v.rows, 1)
-    cols = max(v.columns, 1)
-
-    var_type = v.type
-    values = []
-    for r in range(rows):
-        for c in range(cols):
-            idx = r * cols + c
-            if var_type == rd.VarType.Float or var_type == rd.VarType.Half:
-                values.append(v.value.f32v[idx])
-            elif var_type == rd.VarType.Double:
-                values.append(v.value.f64v[idx])
-            elif var_type in (rd.VarType.SInt, rd.VarType.SShort, rd.VarType.SByte):
-                values.append(v.value.s32v[idx])
-            elif var_type in (rd.VarType.UInt, rd.VarType.UShort, rd.VarType.UByte, rd.VarType.Bool):
-                values.append(v.value.u32v[idx])
-            elif var_type == rd.VarType.SLong:
-                values.append(v.value.s64v[idx])
-            elif var_type == rd.VarType.ULong:
-                values.append(v.value.u64v[idx])
-            else:
-                values.append(v.value.f32v[idx])
+        rows = max(v.rows, 1)
+        cols = max(v.columns, 1)
 
-    if len(values) == 1:
-        values = values[0]
+        var_type = v.type
+        arr = getattr(v.value, value_attr(var_type, "f32v"))
+        values = list(arr[:rows * cols])
 
-    return {
-        "name": v.name,
-        "type": str(var_type),
-        "rows": rows,
-        "columns": cols,
-        "value": values,
-    }
+        if len(values) == 1:
+            values = values[0]
 
+        d["type"] = _enum_str(var_type)
+        d["rows"] = rows
+        d["columns"] = cols
+        d["value"] = values
 
-def _vartype_str(vartype):
-    """Human-readable name for a VarType enum."""
-    _map = {
-        rd.VarType.Float:  "float",
-        rd.VarType.Half:   "half",
-        rd.VarType.Double: "double",
-        rd.VarType.SInt:   "int",
-        rd.VarType.UInt:   "uint",
-        rd.VarType.SShort: "short",
-        rd.VarType.UShort: "ushort",
-        rd.VarType.SByte:  "sbyte",
-        rd.VarType.UByte:  "ubyte",
-        rd.VarType.SLong:  "int64",
-        rd.VarType.ULong:  "uint64",
-        rd.VarType.Bool:   "bool",
-    }
-    return _map.get(vartype, str(vartype))
+    return out
 
 
-def _constant_to_layout(const):
-    """Recursively convert a ShaderConstant into a JSON-friendly layout dict."""
-    ctype = const.type
-    entry = {"name": const.name, "byteOffset": const.byteOffset}
+_VARTYPE_NAMES = {
+    rd.VarType.Float:  "float",
+    rd.VarType.Half:   "half",
+    rd.VarType.Double: "double",
+    rd.VarType.SInt:   "int",
+    rd.VarType.UInt:   "uint",
+    rd.VarType.SShort: "short",
+    rd.VarType.UShort: "ushort",
+    rd.VarType.SByte:  "sbyte",
+    rd.VarType.UByte:  "ubyte",
+    rd.VarType.SLong:  "int64",
+    rd.VarType.ULong:  "uint64",
+    rd.VarType.Bool:   "bool",
+}
 
-    if len(ctype.members) > 0:
-        entry["members"] = [_constant_to_layout(m) for m in ctype.members]
-        if ctype.elements > 1:
-            entry["arrayCount"] = ctype.elements
-        if ctype.arrayByteStride > 0:
-            entry["arrayByteStride"] = ctype.arrayByteStride
-    else:
-        rows = max(ctype.rows, 1)
-        cols = max(ctype.columns, 1)
-        base = _vartype_str(ctype.baseType)
-
-        if rows == 1 and cols == 1:
-            entry["type"] = base
-        elif rows == 1:
-            entry["type"] = "%s%d" % (base, cols)
+
+def _vartype_str(vartype):
+    """Human-readable name for a VarType enum."""
+    return _VARTYPE_NAMES.get(vartype) or str(vartype)
+
+
+def _constant_to_layout(root):
+    """
+    Convert a ShaderConstant into a JSON-friendly layout dict.
+
+    Walks nested struct members with an explicit stack, filling each entry in
+    place, rather than recursing once per member.
+    """
+    out = {}
+    stack = [(root, out)]
+    while stack:
+        const, entry = stack.pop()
+        ctype = const.type
+        entry["name"] = const.name
+        entry["byteOffset"] = const.byteOffset
+
+        members = ctype.members
+        if len(members) > 0:
+            children = [{} for _ in members]
+            entry["members"] = children
+            stack.extend(zip(members, children))
         else:
-            entry["type"] = "%s%dx%d" % (base, cols, rows)
+            rows = max(ctype.rows, 1)
+            cols = max(ctype.columns, 1)
+            base = _vartype_str(ctype.baseType)
+
+            if rows == 1 and cols == 1:
+                entry["type"] = base
+            elif rows == 1:
+                entry["type"] = "%s%d" % (base, cols)
+            else:
+                entry["type"] = "%s%dx%d" % (base, cols, rows)
 
         if ctype.elements > 1:
             entry["arrayCount"] = ctype.elements
         if ctype.arrayByteStride > 0:
             entry["arrayByteStride"] = ctype.arrayByteStride
 
-    return entry
+    return out
 
 
 def _resource_layout(shader_res):
@@ -159,19 +277,16 @@ def _resource_layout(shader_res):
 
 def _describe_descriptor_type(desc):
     """Turn a Descriptor's type into a human-readable string."""
-    try:
-        return str(desc.type)
-    except Exception:
-        return "Unknown"
+    return _enum_str(desc.type)
 
 
 def _serialize_stencil_face(face):
     """Serialize a StencilFace into a dict."""
     return {
-        "function": str(face.function),
-        "passOperation": str(face.passOperation),
-        "failOperation": str(face.failOperation),
-        "depthFailOperation": str(face.depthFailOperation),
+        "function": _enum_str(face.function),
+        "passOperation": _enum_str(face.passOperation),
+        "failOperation": _enum_str(face.failOperation),
+        "depthFailOperation": _enum_str(face.depthFailOperation),
         "compareMask": face.compareMask,
         "writeMask": face.writeMask,
         "reference": face.reference,
@@ -186,40 +301,89 @@ def _serialize_color_blend(blend):
     }
     if blend.enabled:
         result["colorBlend"] = {
-            "source": str(blend.colorBlend.source),
-            "destination": str(blend.colorBlend.destination),
-            "operation": str(blend.colorBlend.operation),
+            "source": _enum_str(blend.colorBlend.source),
+            "destination": _enum_str(blend.colorBlend.destination),
+            "operation": _enum_str(blend.colorBlend.operation),
         }
         result["alphaBlend"] = {
-            "source": str(blend.alphaBlend.source),
-            "destination": str(blend.alphaBlend.destination),
-            "operation": str(blend.alphaBlend.operation),
+            "source": _enum_str(blend.alphaBlend.source),
+            "destination": _enum_str(blend.alphaBlend.destination),
+            "operation": _enum_str(blend.alphaBlend.operation),
         }
     return result
 
 
-def _get_texture_info(res_id, controller):
+def _get_texture_info(res_id, textures):
     """Look up width/height/format for a texture resource."""
+    t = textures.get(int(res_id))
+    if t is None:
+        return None
+    info = {
+        "width": t.width,
+        "height": t.height,
+    }
     try:
-        for t in controller.GetTextures():
-            if t.resourceId == res_id:
-                info = {
-                    "width": t.width,
-                    "height": t.height,
-                }
-                try:
-                    info["format"] = str(t.format.Name())
-                except Exception:
-                    pass
-                return info
+        info["format"] = str(t.format.Name())
     except Exception:
         pass
-    return None
-
-
-def _raise():
-    """Helper to raise inside lambdas."""
-    raise RuntimeError("skip")
+    return info
+
+
+# (output key, converter, PipeState methods, Vulkan depthStencil attributes),
+# each candidate list in order of preference. Which names exist depends on
+# the RenderDoc build and the capture's API.
+_DEPTH_STATE_FIELDS = (
+    ("depthTestEnable", bool, ("IsDepthTestEnabled",), ("depthTestEnable", "depthEnable")),
+    ("depthWriteEnable", bool, ("IsDepthWriteEnabled",), ("depthWriteEnable", "writeEnable")),
+    ("depthFunction", _enum_str, ("GetDepthFunction",), ("depthCompareOp", "depthFunction", "func")),
+    ("depthBoundsEnable", bool, ("IsDepthBoundsEnabled",), ("depthBoundsEnable",)),
+)
+
+_STENCIL_STATE_FIELDS = (
+    ("stencilTestEnable", bool, ("IsStencilTestEnabled",), ("stencilTestEnable",)),
+)
+
+_RESOLVED_GETTERS = {}
+
+
+def _resolve_getters(fields, state, ds):
+    """
+    Probe once per (fields, PipeState class, depth-stencil class) which
+    accessors exist for each field; returns (key, convert, candidates) tuples,
+    candidates being the existing (on_state, getter) pairs in preference order.
+    """
+    cache_key = (fields, type(state), type(ds))
+    resolved = _RESOLVED_GETTERS.get(cache_key)
+    if resolved is not None:
+        return resolved
+
+    resolved = []
+    for key, convert, state_methods, ds_attrs in fields:
+        candidates = [(True, methodcaller(name)) for name in state_methods if hasattr(state, name)]
+        if ds is not None:
+            candidates.extend((False, attrgetter(name)) for name in ds_attrs if hasattr(ds, name))
+        if candidates:
+            resolved.append((key, convert, tuple(candidates)))
+
+    _RESOLVED_GETTERS[cache_key] = resolved
+    return resolved
+
+
+def _read_state_fields(fields, state, ds):
+    """
+    Read each resolvable field in fields into a dict. An accessor that exists
+    but raises (e.g. a PipeState method the capture's API doesn't back) falls
+    through to the next candidate; fields no candidate can read are omitted.
+    """
+    out = {}
+    for key, convert, candidates in _resolve_getters(fields, state, ds):
+        for on_state, getter in candidates:
+            try:
+                out[key] = convert(getter(state if on_state else ds))
+                break
+            except Exception:
+                continue
+    return out
 
 
 def _safe_str(val):
@@ -231,14 +395,37 @@ def _safe_str(val):
     return str(val)
 
 
+# Public attribute names per class, so dir() runs once per type rather than
+# once per introspected object.
+_PUBLIC_ATTRS_BY_TYPE = {}
+
+
+def _public_attrs(obj):
+    """Public attribute names of obj's class, cached per type."""
+    cls = type(obj)
+    names = _PUBLIC_ATTRS_BY_TYPE.get(cls)
+    if names is None:
+        names = tuple(n for n in dir(cls) if not n.startswith("_"))
+        _PUBLIC_ATTRS_BY_TYPE[cls] = names
+    return names
+
+
+_DEPTH_ATTRS_BY_TYPE = {}
+
+
+def _depth_attrs(obj):
+    """Public attribute names of obj's class that mention depth, cached per type."""
+    cls = type(obj)
+    names = _DEPTH_ATTRS_BY_TYPE.get(cls)
+    if names is None:
+        names = tuple(n for n in _public_attrs(obj) if "depth" in n.lower())
+        _DEPTH_ATTRS_BY_TYPE[cls] = names
+    return names
+
+
 def _try_introspect_depth(state, vk, depth_state):
     """Introspect PipeState and VK objects to discover depth-related attributes."""
-    for name in dir(state):
-        name_lower = name.lower()
-        if "depth" not in name_lower:
-            continue
-        if name.startswith("_"):
-            continue
+    for name in _depth_attrs(state):
         try:
             attr = getattr(state, name)
             if callable(attr):
@@ -255,9 +442,7 @@ def _try_introspect_depth(state, vk, depth_state):
                 ds = getattr(vk, ds_attr)
             except Exception:
                 continue
-            for name in dir(ds):
-                if name.startswith("_"):
-                    continue
+            for name in _public_attrs(ds):
                 try:
                     val = getattr(ds, name)
                     if not callable(val):
@@ -267,7 +452,83 @@ def _try_introspect_depth(state, vk, depth_state):
             break
 
 
-def _get_fragment_state(state, controller):
+def _get_vertex_input_state(state, resource_names, buffer_sizes):
+    """Collect the bound index buffer and vertex buffers with their attributes."""
+    vertex_input = {}
+
+    ib = state.GetIBuffer()
+    vbs = state.GetVBuffers()
+    attrs = state.GetVertexInputs()
+
+    if ib.resourceId != rd.ResourceId.Null():
+        ib_name = _resource_name(ib.resourceId, resource_names)
+        ib_entry = {
+            "resource": ib_name,
+            "resourceId": _rid_str(ib.resourceId),
+            "byteOffset": ib.byteOffset,
+            "byteStride": ib.byteStride,
+        }
+        buf_size = _buf_size_for_resource(ib.resourceId, buffer_sizes)
+        if buf_size is not None:
+            ib_entry["byteLength"] = buf_size
+        vertex_input["indexBuffer"] = ib_entry
+
+    num_vbs = len(vbs)
+    attrs_by_vb = [[] for _ in range(num_vbs)]
+    for attr in attrs:
+        if 0 <= attr.vertexBuffer < num_vbs:
+            attrs_by_vb[attr.vertexBuffer].append(attr)
+
+    vb_list = []
+    for vb_idx, vb in enumerate(vbs):
+        if vb.resourceId == rd.ResourceId.Null():
+            continue
+
+        vb_name = _resource_name(vb.resourceId, resource_names)
+        vb_entry = {
+            "bindingIndex": vb_idx,
+            "resource": vb_name,
+            "resourceId": _rid_str(vb.resourceId),
+            "byteOffset": vb.byteOffset,
+            "byteStride": vb.byteStride,
+        }
+
+        buf_size = _buf_size_for_resource(vb.resourceId, buffer_sizes)
+        if buf_size is not None:
+            vb_entry["byteLength"] = buf_size
+
+        vb_attrs = attrs_by_vb[vb_idx]
+        if vb_attrs:
+            attr_list = []
+            for attr in vb_attrs:
+                fmt = attr.format
+                per_instance = attr.perInstance
+                attr_entry = {
+                    "name": attr.name,
+                    "byteOffset": attr.byteOffset,
+                    "perInstance": per_instance,
+                    "format": {
+                        "compType": _enum_str(fmt.compType),
+                        "compCount": fmt.compCount,
+                        "compByteWidth": fmt.compByteWidth,
+                    },
+                }
+                if per_instance and attr.instanceRate > 0:
+                    attr_entry["instanceRate"] = attr.instanceRate
+                if attr.genericEnabled:
+                    attr_entry["genericEnabled"] = True
+                attr_list.append(attr_entry)
+            vb_entry["attributes"] = attr_list
+
+        vb_list.append(vb_entry)
+
+    if vb_list:
+        vertex_input["vertexBuffers"] = vb_list
+
+    return vertex_input
+
+
+def _get_fragment_state(state, controller, resource_names, textures):
     """Collect render target, depth, stencil, and blend state."""
     frag = {}
 
@@ -284,13 +545,13 @@ def _get_fragment_state(state, controller):
         for i, desc in enumerate(output_targets):
             if desc.resource == rd.ResourceId.Null():
                 continue
-            res_name = _resource_name(desc.resource, controller)
+            res_name = _resource_name(desc.resource, resource_names)
             rt_entry = {
                 "index": i,
                 "resource": res_name,
-                "resourceId": str(desc.resource),
+                "resourceId": _rid_str(desc.resource),
             }
-            tex_info = _get_texture_info(desc.resource, controller)
+            tex_info = _get_texture_info(desc.resource, textures)
             if tex_info:
                 rt_entry.update(tex_info)
             rt_list.append(rt_entry)
@@ -303,13 +564,13 @@ def _get_fragment_state(state, controller):
             for i, att in enumerate(fb.attachments):
                 if att.imageResourceId == rd.ResourceId.Null():
                     continue
-                res_name = _resource_name(att.imageResourceId, controller)
+                res_name = _resource_name(att.imageResourceId, resource_names)
                 rt_entry = {
                     "index": i,
                     "resource": res_name,
-                    "resourceId": str(att.imageResourceId),
+                    "resourceId": _rid_str(att.imageResourceId),
                 }
-                tex_info = _get_texture_info(att.imageResourceId, controller)
+                tex_info = _get_texture_info(att.imageResourceId, textures)
                 if tex_info:
                     rt_entry.update(tex_info)
                 name_lower = res_name.lower()
@@ -321,13 +582,13 @@ def _get_fragment_state(state, controller):
 
     if not rt_list:
         try:
-            for t in controller.GetTextures():
+            for t in textures.values():
                 if t.creationFlags & rd.TextureCategory.SwapBuffer:
-                    res_name = _resource_name(t.resourceId, controller)
+                    res_name = _resource_name(t.resourceId, resource_names)
                     rt_list.append({
                         "index": 0,
                         "resource": res_name,
-                        "resourceId": str(t.resourceId),
+                        "resourceId": _rid_str(t.resourceId),
                         "width": t.width,
                         "height": t.height,
                         "format": str(t.format.Name()),
@@ -344,12 +605,12 @@ def _get_fragment_state(state, controller):
     try:
         depth_desc = state.GetDepthTarget()
         if depth_desc.resource != rd.ResourceId.Null():
-            res_name = _resource_name(depth_desc.resource, controller)
+            res_name = _resource_name(depth_desc.resource, resource_names)
             depth_entry = {
                 "resource": res_name,
-                "resourceId": str(depth_desc.resource),
+                "resourceId": _rid_str(depth_desc.resource),
             }
-            tex_info = _get_texture_info(depth_desc.resource, controller)
+            tex_info = _get_texture_info(depth_desc.resource, textures)
             if tex_info:
                 depth_entry.update(tex_info)
             frag["depthTarget"] = depth_entry
@@ -357,51 +618,8 @@ def _get_fragment_state(state, controller):
         pass
 
     # Depth State
-    depth_state = {}
-
-    for getter in [
-        lambda: state.IsDepthTestEnabled(),
-        lambda: vk.depthStencil.depthTestEnable if vk else _raise(),
-        lambda: vk.depthStencil.depthEnable if vk else _raise(),
-    ]:
-        try:
-            depth_state["depthTestEnable"] = bool(getter())
-            break
-        except Exception:
-            continue
-
-    for getter in [
-        lambda: state.IsDepthWriteEnabled(),
-        lambda: vk.depthStencil.depthWriteEnable if vk else _raise(),
-        lambda: vk.depthStencil.writeEnable if vk else _raise(),
-    ]:
-        try:
-            depth_state["depthWriteEnable"] = bool(getter())
-            break
-        except Exception:
-            continue
-
-    for getter in [
-        lambda: str(state.GetDepthFunction()),
-        lambda: str(vk.depthStencil.depthCompareOp) if vk else _raise(),
-        lambda: str(vk.depthStencil.depthFunction) if vk else _raise(),
-        lambda: str(vk.depthStencil.func) if vk else _raise(),
-    ]:
-        try:
-            depth_state["depthFunction"] = getter()
-            break
-        except Exception:
-            continue
-
-    for getter in [
-        lambda: state.IsDepthBoundsEnabled(),
-        lambda: vk.depthStencil.depthBoundsEnable if vk else _raise(),
-    ]:
-        try:
-            depth_state["depthBoundsEnable"] = bool(getter())
-            break
-        except Exception:
-            continue
+    ds = getattr(vk, "depthStencil", None) if vk is not None else None
+    depth_state = _read_state_fields(_DEPTH_STATE_FIELDS, state, ds)
 
     if not depth_state:
         _try_introspect_depth(state, vk, depth_state)
@@ -410,17 +628,7 @@ def _get_fragment_state(state, controller):
         frag["depthState"] = depth_state
 
     # Stencil State
-    stencil_state = {}
-
-    for getter in [
-        lambda: state.IsStencilTestEnabled(),
-        lambda: vk.depthStencil.stencilTestEnable if vk else _raise(),
-    ]:
-        try:
-            stencil_state["stencilTestEnable"] = bool(getter())
-            break
-        except Exception:
-            continue
+    stencil_state = _read_state_fields(_STENCIL_STATE_FIELDS, state, ds)
 
     if stencil_state.get("stencilTestEnable", False):
         try:
@@ -465,7 +673,7 @@ def _get_fragment_state(state, controller):
         try:
             blend_state["logicOpEnabled"] = state.IsLogicOpEnabled()
             if state.IsLogicOpEnabled():
-                blend_state["logicOp"] = str(state.GetLogicOp())
+                blend_state["logicOp"] = _enum_str(state.GetLogicOp())
         except Exception:
             pass
         frag["blendState"] = blend_state
@@ -479,10 +687,42 @@ def _get_fragment_state(state, controller):
 # Main logic
 # ---------------------------------------------------------------------------
 
-def run_on_controller(controller, event_id):
-    """Core logic to extract pipeline state."""
+# Everything the sections need from one bound shader stage, read once from the
+# pipeline state and reflection so the sections work on plain Python lists.
+_StageSnapshot = namedtuple("_StageSnapshot", (
+    "name", "stage", "refl", "entry_point",
+    "ro", "ro_refl", "rw", "rw_refl", "samplers", "samplers_refl", "constant_blocks",
+))
+
+
+def _snapshot_stage(state, stage_name, stage, refl):
+    """Fetch a bound stage's bindings and reflection lists in one pass."""
+    return _StageSnapshot(
+        name=stage_name,
+        stage=stage,
+        refl=refl,
+        entry_point=state.GetShaderEntryPoint(stage),
+        ro=list(state.GetReadOnlyResources(stage)),
+        ro_refl=list(refl.readOnlyResources),
+        rw=list(state.GetReadWriteResources(stage)),
+        rw_refl=list(refl.readWriteResources),
+        samplers=list(state.GetSamplers(stage)),
+        samplers_refl=list(refl.samplers),
+        constant_blocks=list(refl.constantBlocks),
+    )
+
+
+def run_on_controller(controller, event_id, include_buffer_sizes=True):
+    """
+    Core logic to extract pipeline state.
+
+    Returns (header, sections): header holds the scalar fields, and sections
+    is a list of (key, generator) pairs producing the list entries lazily so
+    they can be streamed straight into the response file.
+    """
     controller.SetFrameEvent(event_id, False)
     state = controller.GetPipelineState()
+    resource_names, buffer_sizes, textures = _build_lookups(controller, include_buffer_sizes)
 
     stages_to_check = [
         ("Vertex",    rd.ShaderStage.Vertex),
@@ -493,260 +733,179 @@ def run_on_controller(controller, event_id):
         ("Compute",   rd.ShaderStage.Compute),
     ]
 
-    is_compute = state.GetShaderReflection(rd.ShaderStage.Compute) is not None
+    # Each bound stage is snapshotted once and shared by every section below.
+    active_stages = []
+    for stage_name, stage in stages_to_check:
+        refl = state.GetShaderReflection(stage)
+        if refl is None:
+            continue
+        active_stages.append(_snapshot_stage(state, stage_name, stage, refl))
+
+    is_compute = any(snap.stage == rd.ShaderStage.Compute for snap in active_stages)
     if is_compute:
         pipe_obj = state.GetComputePipelineObject()
     else:
         pipe_obj = state.GetGraphicsPipelineObject()
 
-    pipe_name = _resource_name(pipe_obj, controller)
+    pipe_name = _resource_name(pipe_obj, resource_names)
 
-    result = {
+    header = {
         "pipeline": pipe_name,
         "event_id": event_id,
         "is_compute": is_compute,
-        "stages": [],
-        "resources": [],
-        "uniforms": [],
-        "samplers": [],
     }
 
     # --- Stages ---
-    for stage_name, stage in stages_to_check:
-        refl = state.GetShaderReflection(stage)
-        if refl is None:
-            continue
-        entry = state.GetShaderEntryPoint(stage)
-        shader_name = _resource_name(refl.resourceId, controller)
-        stage_entry = {
-            "stage": stage_name,
-            "shader": shader_name,
-            "entryPoint": entry,
+    # Fixed-function state hangs off the vertex and fragment stages, and only
+    # for graphics work; compute pipelines get no per-stage extras at all.
+    if is_compute:
+        stage_extras = {}
+    else:
+        stage_extras = {
+            rd.ShaderStage.Vertex:
+                lambda: _get_vertex_input_state(state, resource_names, buffer_sizes),
+            rd.ShaderStage.Fragment:
+                lambda: _get_fragment_state(state, controller, resource_names, textures),
         }
 
-        # Vertex stage: attach vertex/index buffers
-        if stage == rd.ShaderStage.Vertex and not is_compute:
-            ib = state.GetIBuffer()
-            vbs = state.GetVBuffers()
-            attrs = state.GetVertexInputs()
-
-            if ib.resourceId != rd.ResourceId.Null():
-                ib_name = _resource_name(ib.resourceId, controller)
-                ib_entry = {
-                    "resource": ib_name,
-                    "resourceId": str(ib.resourceId),
-                    "byteOffset": ib.byteOffset,
-                    "byteStride": ib.byteStride,
-                }
-                buf_size = _buf_size_for_resource(ib.resourceId, controller)
-                if buf_size is not None:
-                    ib_entry["contents"] = "%d bytes" % buf_size
-                stage_entry["indexBuffer"] = ib_entry
-
-            attrs_by_vb = defaultdict(list)
-            for attr in attrs:
-                attrs_by_vb[attr.vertexBuffer].append(attr)
-
-            vb_list = []
-            for vb_idx, vb in enumerate(vbs):
-                if vb.resourceId == rd.ResourceId.Null():
-                    continue
+    def _stages():
+        for snap in active_stages:
+            shader_name = _resource_name(snap.refl.resourceId, resource_names)
+            stage_entry = {
+                "stage": snap.name,
+                "shader": shader_name,
+                "entryPoint": snap.entry_point,
+            }
 
-                vb_name = _resource_name(vb.resourceId, controller)
-                vb_entry = {
-                    "bindingIndex": vb_idx,
-                    "resource": vb_name,
-                    "resourceId": str(vb.resourceId),
-                    "byteOffset": vb.byteOffset,
-                    "byteStride": vb.byteStride,
-                }
+            extra = stage_extras.get(snap.stage)
+            if extra is not None:
+                stage_entry.update(extra())
 
-                buf_size = _buf_size_for_resource(vb.resourceId, controller)
-                if buf_size is not None:
-                    vb_entry["contents"] = "%d bytes" % buf_size
-
-                vb_attrs = attrs_by_vb.get(vb_idx, [])
-                if vb_attrs:
-                    vb_entry["attributes"] = []
-                    for attr in vb_attrs:
-                        attr_entry = {
-                            "name": attr.name,
-                            "byteOffset": attr.byteOffset,
-                            "perInstance": attr.perInstance,
-                            "format": {
-                                "compType": str(attr.format.compType),
-                                "compCount": attr.format.compCount,
-                                "compByteWidth": attr.format.compByteWidth,
-                            },
-                        }
-                        if attr.perInstance and attr.instanceRate > 0:
-                            attr_entry["instanceRate"] = attr.instanceRate
-                        if attr.genericEnabled:
-                            attr_entry["genericEnabled"] = True
-                        vb_entry["attributes"].append(attr_entry)
-
-                vb_list.append(vb_entry)
-
-            if vb_list:
-                stage_entry["vertexBuffers"] = vb_list
-
-        # Fragment stage: attach render targets and fixed-function state
-        if stage == rd.ShaderStage.Fragment and not is_compute:
-            stage_entry.update(_get_fragment_state(state, controller))
-
-        result["stages"].append(stage_entry)
+            yield stage_entry
 
     # --- Resources (RO + RW) ---
-    for stage_name, stage in stages_to_check:
-        refl = state.GetShaderReflection(stage)
-        if refl is None:
-            continue
-
-        # Read-only resources
-        ro_list = state.GetReadOnlyResources(stage)
-        for i, used in enumerate(ro_list):
-            res_refl = refl.readOnlyResources[i] if i < len(refl.readOnlyResources) else None
-            desc = used.descriptor
-
-            binding_name = res_refl.name if res_refl else "unknown"
-            set_num = res_refl.fixedBindSetOrSpace if res_refl else -1
-            bind_num = res_refl.fixedBindNumber if res_refl else -1
-            res_name = _resource_name(desc.resource, controller)
-            desc_type = _describe_descriptor_type(desc)
-
-            entry = {
-                "stage": stage_name,
-                "set": set_num,
-                "binding": bind_num,
-                "name": binding_name,
-                "access": "ReadOnly",
-                "type": desc_type,
-                "resource": res_name,
-                "resourceId": str(desc.resource),
-            }
-
-            buf_size = _buf_size_for_resource(desc.resource, controller)
-            if buf_size is not None:
-                entry["contents"] = "%d bytes" % buf_size
-
-            if res_refl is not None:
-                layout = _resource_layout(res_refl)
-                if layout is not None:
-                    entry["layout"] = layout
-
-            result["resources"].append(entry)
-
-        # Read-write resources
-        rw_list = state.GetReadWriteResources(stage)
-        for i, used in enumerate(rw_list):
-            res_refl = refl.readWriteResources[i] if i < len(refl.readWriteResources) else None
-            desc = used.descriptor
-
-            binding_name = res_refl.name if res_refl else "unknown"
-            set_num = res_refl.fixedBindSetOrSpace if res_refl else -1
-            bind_num = res_refl.fixedBindNumber if res_refl else -1
-            res_name = _resource_name(desc.resource, controller)
-            desc_type = _describe_descriptor_type(desc)
-
-            entry = {
-                "stage": stage_name,
-                "set": set_num,
-                "binding": bind_num,
-                "name": binding_name,
-                "access": "ReadWrite",
-                "type": desc_type,
-                "resource": res_name,
-                "resourceId": str(desc.resource),
-            }
+    def _resources():
+        for snap in active_stages:
+            for access, used_list, refl_list in (
+                ("ReadOnly", snap.ro, snap.ro_refl),
+                ("ReadWrite", snap.rw, snap.rw_refl),
+            ):
+                num_refl = len(refl_list)
+                for i, used in enumerate(used_list):
+                    res_refl = refl_list[i] if i < num_refl else None
+                    desc = used.descriptor
+
+                    binding_name = res_refl.name if res_refl else "unknown"
+                    set_num = res_refl.fixedBindSetOrSpace if res_refl else -1
+                    bind_num = res_refl.fixedBindNumber if res_refl else -1
+                    res_name = _resource_name(desc.resource, resource_names)
+                    desc_type = _describe_descriptor_type(desc)
+
+                    entry = {
+                        "stage": snap.name,
+                        "set": set_num,
+                        "binding": bind_num,
+                        "name": binding_name,
+                        "access": access,
+                        "type": desc_type,
+                        "resource": res_name,
+                        "resourceId": _rid_str(desc.resource),
+                    }
 
-            buf_size = _buf_size_for_resource(desc.resource, controller)
-            if buf_size is not None:
-                entry["contents"] = "%d bytes" % buf_size
+                    buf_size = _buf_size_for_resource(desc.resource, buffer_sizes)
+                    if buf_size is not None:
+                        entry["byteLength"] = buf_size
 
-            if res_refl is not None:
-                layout = _resource_layout(res_refl)
-                if layout is not None:
-                    entry["layout"] = layout
+                    if res_refl is not None:
+                        layout = _resource_layout(res_refl)
+                        if layout is not None:
+                            entry["layout"] = layout
 
-            result["resources"].append(entry)
+                    yield entry
 
     # --- Uniforms / Constant Buffers ---
-    for stage_name, stage in stages_to_check:
-        refl = state.GetShaderReflection(stage)
-        if refl is None:
-            continue
-
-        entry_point = state.GetShaderEntryPoint(stage)
-
-        for cb_idx, cb_refl in enumerate(refl.constantBlocks):
-            try:
-                cb = state.GetConstantBlock(stage, cb_idx, 0)
-            except Exception:
-                continue
+    def _uniforms():
+        for snap in active_stages:
+            stage = snap.stage
+            for cb_idx, cb_refl in enumerate(snap.constant_blocks):
+                try:
+                    cb = state.GetConstantBlock(stage, cb_idx, 0)
+                except Exception:
+                    continue
 
-            cb_resource = cb.descriptor.resource
-            if cb_resource == rd.ResourceId.Null():
-                continue
+                cb_resource = cb.descriptor.resource
+                if cb_resource == rd.ResourceId.Null():
+                    continue
 
-            res_name = _resource_name(cb_resource, controller)
+                res_name = _resource_name(cb_resource, resource_names)
 
-            variables = []
-            var_count = 0
-            try:
-                var_list = controller.GetCBufferVariableContents(
-                    pipe_obj, refl.resourceId, stage, entry_point,
-                    cb_idx, cb_resource, 0, 0
-                )
-                var_count = len(var_list)
-                variables = [_shader_var_to_dict(v) for v in var_list]
-            except Exception as e:
-                variables = [{"error": str(e)}]
-
-            buf_size = _buf_size_for_resource(cb_resource, controller)
-
-            uniform_entry = {
-                "stage": stage_name,
-                "set": cb_refl.fixedBindSetOrSpace,
-                "binding": cb_refl.fixedBindNumber,
-                "name": cb_refl.name,
-                "resource": res_name,
-                "resourceId": str(cb_resource),
-                "variableCount": var_count,
-                "variables": variables,
-            }
-            if buf_size is not None:
-                uniform_entry["contents"] = "%d bytes" % buf_size
+                # Decoded by RenderDoc rather than from GetBufferData bytes:
+                # it already applies the API's packing, matrix majorness and
+                # push-constant sourcing, and each leaf's values are taken with
+                # a single slice in _shader_var_to_dict. The call stays on this
+                # thread: ReplayController must only be used from the thread
+                # that opened it.
+                variables = []
+                var_count = 0
+                try:
+                    var_list = controller.GetCBufferVariableContents(
+                        pipe_obj, snap.refl.resourceId, stage, snap.entry_point,
+                        cb_idx, cb_resource, 0, 0
+                    )
+                    var_count = len(var_list)
+                    variables = [_shader_var_to_dict(v) for v in var_list]
+                except Exception as e:
+                    variables = [{"error": str(e)}]
+
+                buf_size = _buf_size_for_resource(cb_resource, buffer_sizes)
+
+                uniform_entry = {
+                    "stage": snap.name,
+                    "set": cb_refl.fixedBindSetOrSpace,
+                    "binding": cb_refl.fixedBindNumber,
+                    "name": cb_refl.name,
+                    "resource": res_name,
+                    "resourceId": _rid_str(cb_resource),
+                    "variableCount": var_count,
+                    "variables": variables,
+                }
+                if buf_size is not None:
+                    uniform_entry["byteLength"] = buf_size
 
-            result["uniforms"].append(uniform_entry)
+                yield uniform_entry
 
     # --- Samplers ---
-    for stage_name, stage in stages_to_check:
-        refl = state.GetShaderReflection(stage)
-        if refl is None:
-            continue
-
-        sampler_list = state.GetSamplers(stage)
-        for i, used in enumerate(sampler_list):
-            samp_refl = refl.samplers[i] if i < len(refl.samplers) else None
-            samp_name = samp_refl.name if samp_refl else "unknown"
-            set_num = samp_refl.fixedBindSetOrSpace if samp_refl else -1
-            bind_num = samp_refl.fixedBindNumber if samp_refl else -1
-
-            result["samplers"].append({
-                "stage": stage_name,
-                "set": set_num,
-                "binding": bind_num,
-                "name": samp_name,
-            })
+    def _samplers():
+        for snap in active_stages:
+            num_refl = len(snap.samplers_refl)
+            for i, used in enumerate(snap.samplers):
+                samp_refl = snap.samplers_refl[i] if i < num_refl else None
+                samp_name = samp_refl.name if samp_refl else "unknown"
+                set_num = samp_refl.fixedBindSetOrSpace if samp_refl else -1
+                bind_num = samp_refl.fixedBindNumber if samp_refl else -1
+
+                yield {
+                    "stage": snap.name,
+                    "set": set_num,
+                    "binding": bind_num,
+                    "name": samp_name,
+                }
 
-    return result
+    sections = [
+        ("stages", _stages()),
+        ("resources", _resources()),
+        ("uniforms", _uniforms()),
+        ("samplers", _samplers()),
+    ]
+    return header, sections
 
 
 def main() -> None:
-    with open(REQ_PATH, "r", encoding="utf-8") as f:
-        req = json.load(f)
+    with open(REQ_PATH, "rb") as f:
+        req = _loads(f.read())
 
     event_id = req["event_id"]
+    include_buffer_sizes = req.get("include_buffer_sizes", True)
 
     rd.InitialiseReplay(rd.GlobalEnvironment(), [])
 
@@ -764,9 +923,9 @@ def main() -> None:
             raise RuntimeError("Couldn't initialise replay: " + str(result))
 
         try:
-            document = run_on_controller(controller, event_id)
-            document["capture_path"] = req["capture_path"]
-            write_envelope(True, result=document)
+            header, sections = run_on_controller(controller, event_id, include_buffer_sizes)
+            header["capture_path"] = req["capture_path"]
+            write_streamed_envelope(header, sections)
         finally:
             try:
                 controller.Shutdown()
@@ -783,6 +942,12 @@ def main() -> None:
 if __name__ == "__main__":
     try:
         main()
-    except Exception:
-        write_envelope(False, error=traceback.format_exc())
+    except Exception as e:
+        # Full tracebacks only on request; repr(e) is enough to report the failure.
+        if os.environ.get("RENDERDOG_DEBUG"):
+            import traceback
+            error = traceback.format_exc()
+        else:
+            error = repr(e)
+        write_envelope(False, error=error)
     raise SystemExit(0)
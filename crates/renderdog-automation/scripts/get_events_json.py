@@ -23,79 +23,121 @@ Where:
 
 import json
 import traceback
+from operator import itemgetter
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    # Match orjson's compact output; the default separators pad every
+    # key and element with a space.
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data.decode("utf-8"))
+
 
 REQ_PATH = "get_events_json.request.json"
 RESP_PATH = "get_events_json.response.json"
 
+# Events are written one small fragment at a time; buffer them in large blocks.
+RESP_WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
 
 
-def get_scope(action):
+def write_events_envelope(capture_path: str, rows) -> None:
     """
-    Walk up the parent chain to build the full debug-marker scope path.
-    Marker regions (vkCmdBeginDebugUtilsLabelEXT, etc.) show up as parent
-    actions in the tree.  We collect them root -> leaf and join with " > ".
+    Write a successful envelope, serializing the (event_id, scope, name) rows
+    one at a time straight into the response file instead of building the
+    whole document as one string first.
     """
-    parts = []
-    parent = action.parent
-    while parent is not None:
-        name = parent.customName if parent.customName else ""
-        if name:
-            parts.append(name)
-        parent = parent.parent
-
-    parts.reverse()
-    return " > ".join(parts)
-
-
-def walk_actions(action, structured_file, rows):
+    with open(RESP_PATH, "wb", buffering=RESP_WRITE_BUFFER_SIZE) as f:
+        f.write(b'{"ok":true,"error":null,"result":{"capture_path":')
+        f.write(_dumps(capture_path))
+        f.write(b',"total_events":%d,"events":[' % len(rows))
+        sep = b""
+        for eid, scope, name in rows:
+            f.write(sep)
+            sep = b","
+            f.write(_dumps({"event_id": eid, "scope": scope, "name": name}))
+        f.write(b"]}}")
+
+
+def walk_actions(root_actions, structured_file, rows):
     """
-    Recursively walk the action tree.  For every leaf action (and every
-    APIEvent within it), emit a row.  Marker regions themselves also get a
-    row so you can see where they begin.
-    """
-    scope = get_scope(action)
-
-    action_name = action.GetName(structured_file)
+    Walk the action tree.  For every leaf action (and every APIEvent within
+    it), emit an (event_id, scope, name) row.  Marker regions themselves also get a row so you can
+    see where they begin.
 
-    if len(action.events) > 0:
-        for event in action.events:
-            eid = event.eventId
-            chunk_name = ""
-            if event.chunkIndex < len(structured_file.chunks):
-                chunk = structured_file.chunks[event.chunkIndex]
-                chunk_name = chunk.name
+    Marker regions (vkCmdBeginDebugUtilsLabelEXT, etc.) show up as parent
+    actions in the tree.  Each action's scope is its ancestors' marker names
+    joined root -> leaf with " > "; it is carried down an explicit stack so
+    every parent chain is joined once rather than re-walked per descendant.
 
-            if eid == action.eventId:
-                display_name = action_name
+    Scopes and chunk names repeat across many rows (the same marker region
+    entered every frame, the same API call issued thousands of times), so
+    each distinct string is interned and rows share one object.
+    """
+    chunks = structured_file.chunks
+    num_chunks = len(chunks)
+
+    # The scripts run uncompiled inside qrenderdoc, so the loop keeps its
+    # bound methods in locals rather than re-resolving them per action.
+    add_row = rows.append
+
+    interned = {}
+    intern = interned.setdefault
+
+    stack = [(action, "") for action in reversed(root_actions)]
+    pop = stack.pop
+    push_all = stack.extend
+    while stack:
+        action, scope = pop()
+
+        action_name = action.GetName(structured_file)
+        action_eid = action.eventId
+
+        if len(action.events) > 0:
+            for event in action.events:
+                eid = event.eventId
+                if eid == action_eid:
+                    display_name = action_name
+                elif event.chunkIndex < num_chunks:
+                    chunk_name = chunks[event.chunkIndex].name
+                    display_name = intern(chunk_name, chunk_name)
+                else:
+                    display_name = ""
+
+                add_row((int(eid), scope, display_name))
+        else:
+            add_row((int(action_eid), scope, action_name))
+
+        children = action.children
+        if len(children) > 0:
+            name = action.customName
+            if name:
+                child_scope = scope + " > " + name if scope else name
+                child_scope = intern(child_scope, child_scope)
             else:
-                display_name = chunk_name
-
-            rows.append({
-                "event_id": int(eid),
-                "scope": scope,
-                "name": display_name,
-            })
-    else:
-        rows.append({
-            "event_id": int(action.eventId),
-            "scope": scope,
-            "name": action_name,
-        })
-
-    for child in action.children:
-        walk_actions(child, structured_file, rows)
+                child_scope = scope
+            push_all((child, child_scope) for child in reversed(children))
 
 
 def main() -> None:
-    with open(REQ_PATH, "r", encoding="utf-8") as f:
-        req = json.load(f)
+    with open(REQ_PATH, "rb") as f:
+        req = _loads(f.read())
 
     rd.InitialiseReplay(rd.GlobalEnvironment(), [])
 
@@ -117,19 +159,11 @@ def main() -> None:
             root_actions = controller.GetRootActions()
 
             rows = []
-            for action in root_actions:
-                walk_actions(action, structured_file, rows)
-
-            rows.sort(key=lambda r: r["event_id"])
-
-            write_envelope(
-                True,
-                result={
-                    "capture_path": req["capture_path"],
-                    "total_events": len(rows),
-                    "events": rows,
-                },
-            )
+            walk_actions(root_actions, structured_file, rows)
+
+            rows.sort(key=itemgetter(0))
+
+            write_events_envelope(req["capture_path"], rows)
         finally:
             try:
                 controller.Shutdown()
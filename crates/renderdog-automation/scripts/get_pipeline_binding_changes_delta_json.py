@@ -20,14 +20,31 @@ import traceback
 
 import renderdoc as rd
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    # Match orjson's compact output; the default separators pad every
+    # key and element with a space.
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data.decode("utf-8"))
+
 
 REQ_PATH = "get_pipeline_binding_changes_delta_json.request.json"
 RESP_PATH = "get_pipeline_binding_changes_delta_json.response.json"
 
 
 def write_envelope(ok: bool, result=None, error: str = None) -> None:
-    with open(RESP_PATH, "w", encoding="utf-8") as f:
-        json.dump({"ok": ok, "result": result, "error": error}, f, ensure_ascii=False)
+    payload = _dumps({"ok": ok, "result": result, "error": error})
+    with open(RESP_PATH, "wb") as f:
+        f.write(payload)
 
 
 # ---------------------------------------------------------------------------
@@ -43,6 +60,12 @@ _ALL_STAGES = [
     rd.ShaderStage.Compute,
 ]
 
+_NULL_ID = rd.ResourceId.Null()
+
+# Older builds lack fixed bind points on reflection entries; fall back to the
+# binding's index there. Resources and samplers share the same bind fields.
+_HAS_FIXED_BIND = hasattr(rd.ShaderResource, "fixedBindSetOrSpace")
+
 _STAGE_NAMES = {
     rd.ShaderStage.Vertex: "Vertex",
     rd.ShaderStage.Tess_Control: "TessControl",
@@ -57,61 +80,290 @@ _STAGE_NAMES = {
 # Pipeline finding
 # ---------------------------------------------------------------------------
 
-def find_pipeline(controller, pipeline_name):
-    """Locate the target pipeline's resource description by name."""
-    for res in controller.GetResources():
-        if res.name == pipeline_name and res.type == rd.ResourceType.PipelineState:
-            return res
+def find_pipeline(resources, pipeline_name):
+    """
+    Locate the target pipeline's resource description by name.
 
-    for res in controller.GetResources():
-        if res.type == rd.ResourceType.PipelineState and pipeline_name in res.name:
+    An exact name match wins and ends the scan; otherwise the first pipeline
+    whose name contains pipeline_name is returned.
+    """
+    pipeline_type = rd.ResourceType.PipelineState
+    partial = None
+    available = []
+    for res in resources:
+        if res.type != pipeline_type:
+            continue
+        name = res.name
+        if name == pipeline_name:
             return res
+        if partial is None and pipeline_name in name:
+            partial = res
+        if len(available) < 30:
+            available.append(f"  {res.resourceId}  {name}")
 
-    available = []
-    for r in controller.GetResources():
-        if r.type == rd.ResourceType.PipelineState:
-            available.append("  %s  %s" % (r.resourceId, r.name))
+    if partial is not None:
+        return partial
 
-    raise RuntimeError(
-        "Pipeline '%s' not found. Available pipelines:\n%s"
-        % (pipeline_name, "\n".join(available[:30]))
-    )
+    available = "\n".join(available)
+    raise RuntimeError(f"Pipeline '{pipeline_name}' not found. Available pipelines:\n{available}")
 
 
 def flatten_actions(roots):
     """Yield every leaf action in linear order."""
-    for action in roots:
-        if len(action.children) > 0:
-            yield from flatten_actions(action.children)
+    stack = list(reversed(roots))
+    while stack:
+        action = stack.pop()
+        children = action.children
+        if len(children) > 0:
+            stack.extend(reversed(children))
         else:
             yield action
 
 
-def get_name(controller, rid):
-    """Get resource name by ID."""
-    if rid == rd.ResourceId.Null():
-        return None
+# ---------------------------------------------------------------------------
+# Structured-file prefilter
+# ---------------------------------------------------------------------------
+
+# Bind calls, by chunk-name substring: (bound pipeline argument, bind-point
+# argument or None for APIs with a single pipeline slot).
+_PIPELINE_BIND_CHUNKS = (
+    ("vkCmdBindPipeline", "pipeline", "pipelineBindPoint"),
+    ("SetPipelineState", "pPipelineState", None),
+)
+
+# Calls after which nothing is bound, by chunk-name substring: a fresh
+# command buffer/list, or D3D12's ClearState. Each pairs with the argument of
+# the pipeline the call binds as it resets (Reset's pInitialState, ClearState's
+# pPipelineState), or None if it binds nothing.
+_PIPELINE_RESET_CHUNKS = (
+    ("vkBeginCommandBuffer", None),
+    ("CommandList::Reset", "pInitialState"),
+    ("ClearState", "pPipelineState"),
+)
+
+# Calls after which bound state can no longer be predicted from the stream:
+# nested command buffers/bundles, and the end of a recording (so an inlined
+# secondary's binds never leak into the primary that executed it).
+_PIPELINE_UNKNOWN_CHUNKS = (
+    "vkCmdExecuteCommands", "ExecuteBundle", "vkEndCommandBuffer", "CommandList::Close",
+)
+
+
+# Calls that cannot change any binding extract_current_bindings reports: the
+# draws/dispatches themselves, dynamic fixed-function state, push/root
+# constants, barriers and debug markers. Anything else forces a re-read.
+_BINDING_NEUTRAL_CHUNKS = (
+    "Draw", "Dispatch",
+    "SetViewport", "SetScissor", "SetLineWidth", "SetDepthBias", "SetDepthBounds",
+    "SetBlendConstants", "SetBlendFactor", "SetStencil",
+    "PushConstants", "32BitConstant",
+    "PipelineBarrier", "ResourceBarrier",
+    "DebugUtilsLabel", "DebugMarker", "BeginEvent", "EndEvent", "SetMarker",
+)
+
+
+def get_sd_child(obj, name):
+    """Get a child SDObject by name."""
     try:
-        for r in controller.GetResources():
-            if r.resourceId == rid:
-                return r.name
+        for i in range(obj.NumChildren()):
+            child = obj.GetChild(i)
+            if child.name == name:
+                return child
     except Exception:
         pass
-    return str(rid)
+    return None
+
+
+def _bound_pipeline_from_chunk(chunk, pipeline_arg, bind_point_arg):
+    """Return (slot, int pipeline id) for a bind chunk, or None if unparseable."""
+    pipe_obj = get_sd_child(chunk, pipeline_arg)
+    if pipe_obj is None:
+        return None
+    try:
+        pipe_id = int(pipe_obj.AsResourceId())
+    except Exception:
+        return None
+
+    slot = None
+    if bind_point_arg is not None:
+        bp_obj = get_sd_child(chunk, bind_point_arg)
+        if bp_obj is None:
+            return None
+        try:
+            slot = bp_obj.AsInt()
+        except Exception:
+            return None
+    return slot, pipe_id
+
+
+def find_skippable_events(structured_file, roots, pipeline_id):
+    """
+    Scan the API events in action order and return (skippable, unchanged):
+
+    - skippable: eventIds of leaf actions at which the structured file proves
+      pipeline_id is not bound, so they need no SetFrameEvent replay.
+    - unchanged: eventIds of leaf actions preceded, back to the previous leaf
+      action, only by calls in _BINDING_NEUTRAL_CHUNKS. If the previous leaf
+      had the pipeline bound, this one has it bound with identical bindings.
+
+    Bound pipelines are followed through the API events in order. Until a
+    command buffer/list reset makes the state known, or after any call whose
+    effect cannot be predicted, nothing is skipped; APIs without recognised
+    bind chunks therefore replay every action as before.
+    """
+    chunks = structured_file.chunks
+    num_chunks = len(chunks)
+    target = int(pipeline_id)
+
+    skippable = set()
+    unchanged = set()
+    slots = None  # slot -> int pipeline id; None while bound state is unknown
+    neutral = False  # only binding-neutral calls since the previous leaf
+
+    stack = list(reversed(roots))
+    while stack:
+        action = stack.pop()
+
+        for event in action.events:
+            if event.chunkIndex >= num_chunks:
+                neutral = False
+                continue
+            chunk = chunks[event.chunkIndex]
+            chunk_name = chunk.name
+
+            if neutral and not any(tag in chunk_name for tag in _BINDING_NEUTRAL_CHUNKS):
+                neutral = False
+
+            if any(tag in chunk_name for tag in _PIPELINE_UNKNOWN_CHUNKS):
+                slots = None
+                continue
+
+            reset = False
+            for tag, pipeline_arg in _PIPELINE_RESET_CHUNKS:
+                if tag in chunk_name:
+                    reset = True
+                    slots = {}
+                    if pipeline_arg is not None:
+                        bound = _bound_pipeline_from_chunk(chunk, pipeline_arg, None)
+                        if bound is None:
+                            slots = None
+                        else:
+                            slots[bound[0]] = bound[1]
+                    break
+            if reset:
+                continue
+
+            for tag, pipeline_arg, bind_point_arg in _PIPELINE_BIND_CHUNKS:
+                if tag in chunk_name:
+                    bound = _bound_pipeline_from_chunk(chunk, pipeline_arg, bind_point_arg)
+                    if bound is None:
+                        slots = None
+                    elif slots is not None:
+                        slots[bound[0]] = bound[1]
+                    break
+
+        children = action.children
+        if len(children) > 0:
+            stack.extend(reversed(children))
+            continue
+
+        if slots is not None and target not in slots.values():
+            skippable.add(action.eventId)
+        elif neutral:
+            unchanged.add(action.eventId)
+        neutral = True
+
+    return skippable, unchanged
+
+
+def get_value(resource_names, rid):
+    """
+    A bound resource as a (resource_id, resource_name) pair, named from the
+    int(ResourceId) -> name map; (None, None) if nothing is bound.
+    """
+    if rid == _NULL_ID:
+        return (None, None)
+    rid_int = int(rid)
+    name = resource_names.get(rid_int)
+    return (rid_int, name if name is not None else str(rid))
+
+
+def value_to_dict(value):
+    """Expand a (resource_id, resource_name) pair to its JSON form."""
+    return {"resource_id": value[0], "resource_name": value[1]}
 
 
 # ---------------------------------------------------------------------------
 # Binding tracking
 # ---------------------------------------------------------------------------
 
+# Binding keys pack interned string ids and the set/binding numbers into one
+# int, 32 bits per field, so the per-event dict operations hash a single int
+# instead of a 5-tuple.
+_KEY_FIELD_BITS = 32
+_KEY_FIELD_MASK = (1 << _KEY_FIELD_BITS) - 1
+
+_interned_ids = {}
+_interned_strings = []
+
+
+def intern_id(text):
+    """Return a stable small int id for text."""
+    text_id = _interned_ids.get(text)
+    if text_id is None:
+        text_id = len(_interned_strings)
+        _interned_ids[text] = text_id
+        _interned_strings.append(text)
+    return text_id
+
+
 def get_binding_key(stage_name, binding_type, set_num, binding_num, name):
-    """Create a unique key for a binding point."""
-    return (stage_name, binding_type, set_num, binding_num, name)
+    """Create a unique integer key for a binding point."""
+    key = intern_id(stage_name)
+    key = (key << _KEY_FIELD_BITS) | intern_id(binding_type)
+    key = (key << _KEY_FIELD_BITS) | (set_num & _KEY_FIELD_MASK)
+    key = (key << _KEY_FIELD_BITS) | (binding_num & _KEY_FIELD_MASK)
+    return (key << _KEY_FIELD_BITS) | intern_id(name)
+
+
+def decode_binding_key(key):
+    """Inverse of get_binding_key: (stage_name, binding_type, set, binding, name)."""
+    name_id = key & _KEY_FIELD_MASK
+    key >>= _KEY_FIELD_BITS
+    binding_num = key & _KEY_FIELD_MASK
+    key >>= _KEY_FIELD_BITS
+    set_num = key & _KEY_FIELD_MASK
+    key >>= _KEY_FIELD_BITS
+    type_id = key & _KEY_FIELD_MASK
+    stage_id = key >> _KEY_FIELD_BITS
+    return (
+        _interned_strings[stage_id],
+        _interned_strings[type_id],
+        set_num,
+        binding_num,
+        _interned_strings[name_id],
+    )
 
 
-def extract_current_bindings(controller, state, pipeline_type):
-    """Extract all current resource bindings from pipeline state."""
-    bindings = {}
+# Per-stage binding lists, paired with the reflection list describing them.
+_BINDING_CATEGORIES = (
+    ("Resource", "GetReadOnlyResources", "readOnlyResources"),
+    ("RWResource", "GetReadWriteResources", "readWriteResources"),
+    ("Sampler", "GetSamplers", "samplers"),
+)
+
+
+def build_binding_layout(state, pipeline_type):
+    """
+    Precompute the binding keys of every reflected stage of the bound pipeline.
+
+    Reflection only depends on the pipeline, which is the same at every event
+    we extract bindings for, so this is done once per run and the per-event
+    work reduces to pairing each bound descriptor with its precomputed key.
+    Returns a list of (stage, [(binding list getter name, keys), ...]).
+    """
+    layout = []
+    stage_names_get = _STAGE_NAMES.get
 
     stages = _ALL_STAGES if pipeline_type == "Graphics" else [rd.ShaderStage.Compute]
 
@@ -120,71 +372,45 @@ def extract_current_bindings(controller, state, pipeline_type):
         if refl is None:
             continue
 
-        stage_name = _STAGE_NAMES.get(stage, str(stage))
+        stage_name = stage_names_get(stage, str(stage))
 
-        # Read-only resources
+        # A stage whose reflection can't be read contributes nothing.
         try:
-            ro_list = state.GetReadOnlyResources(stage)
-            for i, binding in enumerate(ro_list):
-                if i < len(refl.readOnlyResources):
-                    res_info = refl.readOnlyResources[i]
-                    try:
+            categories = []
+            for category, getter_name, refl_attr in _BINDING_CATEGORIES:
+                keys = []
+                for i, res_info in enumerate(getattr(refl, refl_attr)):
+                    if _HAS_FIXED_BIND:
                         set_num = res_info.fixedBindSetOrSpace
                         binding_num = res_info.fixedBindNumber
-                    except Exception:
+                    else:
                         set_num = 0
                         binding_num = i
-
-                    key = get_binding_key(stage_name, "Resource", set_num, binding_num, res_info.name)
-                    bound_res = binding.descriptor.resource
-                    bindings[key] = {
-                        "resource_id": int(bound_res) if bound_res != rd.ResourceId.Null() else None,
-                        "resource_name": get_name(controller, bound_res),
-                    }
+                    keys.append(get_binding_key(stage_name, category, set_num, binding_num, res_info.name))
+                categories.append((getter_name, keys))
         except Exception:
-            pass
+            continue
 
-        # Read-write resources
-        try:
-            rw_list = state.GetReadWriteResources(stage)
-            for i, binding in enumerate(rw_list):
-                if i < len(refl.readWriteResources):
-                    res_info = refl.readWriteResources[i]
-                    try:
-                        set_num = res_info.fixedBindSetOrSpace
-                        binding_num = res_info.fixedBindNumber
-                    except Exception:
-                        set_num = 0
-                        binding_num = i
+        layout.append((stage, categories))
 
-                    key = get_binding_key(stage_name, "RWResource", set_num, binding_num, res_info.name)
-                    bound_res = binding.descriptor.resource
-                    bindings[key] = {
-                        "resource_id": int(bound_res) if bound_res != rd.ResourceId.Null() else None,
-                        "resource_name": get_name(controller, bound_res),
-                    }
-        except Exception:
-            pass
+    return layout
 
-        # Samplers
-        try:
-            sampler_list = state.GetSamplers(stage)
-            for i, binding in enumerate(sampler_list):
-                if i < len(refl.samplers):
-                    sampler_info = refl.samplers[i]
-                    try:
-                        set_num = sampler_info.fixedBindSetOrSpace
-                        binding_num = sampler_info.fixedBindNumber
-                    except Exception:
-                        set_num = 0
-                        binding_num = i
 
-                    key = get_binding_key(stage_name, "Sampler", set_num, binding_num, sampler_info.name)
-                    bound_res = binding.descriptor.resource
-                    bindings[key] = {
-                        "resource_id": int(bound_res) if bound_res != rd.ResourceId.Null() else None,
-                        "resource_name": get_name(controller, bound_res),
-                    }
+def extract_current_bindings(resource_names, state, pipeline_type, layout):
+    """
+    Extract all current resource bindings from pipeline state, as
+    key -> (resource_id, resource_name).
+    """
+    bindings = {}
+
+    for stage, categories in layout:
+        # The binding lists are readable for every reflected stage on supported
+        # builds, so one guard per stage keeps the per-binding loops try-free.
+        try:
+            for getter_name, keys in categories:
+                # Bindings beyond the reflected ones have no key and are dropped.
+                for key, binding in zip(keys, getattr(state, getter_name)(stage)):
+                    bindings[key] = get_value(resource_names, binding.descriptor.resource)
         except Exception:
             pass
 
@@ -193,109 +419,141 @@ def extract_current_bindings(controller, state, pipeline_type):
         try:
             outputs = state.GetOutputTargets()
             for i, out in enumerate(outputs):
-                key = get_binding_key("Output", "ColorTarget", 0, i, "ColorAttachment%d" % i)
-                bindings[key] = {
-                    "resource_id": int(out.resource) if out.resource != rd.ResourceId.Null() else None,
-                    "resource_name": get_name(controller, out.resource),
-                }
+                key = get_binding_key("Output", "ColorTarget", 0, i, f"ColorAttachment{i}")
+                bindings[key] = get_value(resource_names, out.resource)
         except Exception:
             pass
 
         try:
             depth = state.GetDepthTarget()
             key = get_binding_key("Output", "DepthStencilTarget", 0, 0, "DepthStencil")
-            bindings[key] = {
-                "resource_id": int(depth.resource) if depth.resource != rd.ResourceId.Null() else None,
-                "resource_name": get_name(controller, depth.resource),
-            }
+            bindings[key] = get_value(resource_names, depth.resource)
         except Exception:
             pass
 
     return bindings
 
 
-def track_binding_changes(controller, pipeline_id, pipeline_name, actions):
-    """Track binding changes across all events where the pipeline is active."""
+def detect_pipeline_type(state, pipeline_id):
+    """Return "Graphics"/"Compute" if pipeline_id is bound in state, else None."""
+    try:
+        if state.GetGraphicsPipelineObject() == pipeline_id:
+            return "Graphics"
+    except Exception:
+        pass
 
-    # First pass: determine pipeline type
-    pipeline_type = None
-    for action in actions:
-        controller.SetFrameEvent(action.eventId, False)
-        state = controller.GetPipelineState()
+    try:
+        if state.GetComputePipelineObject() == pipeline_id:
+            return "Compute"
+    except Exception:
+        pass
 
-        try:
-            if state.GetGraphicsPipelineObject() == pipeline_id:
-                pipeline_type = "Graphics"
-                break
-        except Exception:
-            pass
+    return None
 
-        try:
-            if state.GetComputePipelineObject() == pipeline_id:
-                pipeline_type = "Compute"
-                break
-        except Exception:
-            pass
 
-    if pipeline_type is None:
-        raise RuntimeError("Pipeline '%s' is not used in any action." % pipeline_name)
+def track_binding_changes(controller, pipeline_id, pipeline_name, actions, resource_names,
+                          skip_event_ids=frozenset(), unchanged_event_ids=frozenset()):
+    """Track binding changes across all events where the pipeline is active."""
 
-    # Track bindings
-    binding_initial = {}  # key -> (event_id, value)
-    binding_changes = {}  # key -> list of changes
-    last_values = {}      # key -> last value
+    # The pipeline type and binding layout are determined at the first event
+    # that binds the pipeline, in the same replay pass as the tracking itself.
+    pipeline_type = None
+    layout = None
+
+    # Track bindings as parallel columns indexed by a dense binding id,
+    # assigned the first time each binding key is seen.
+    binding_ids = {}     # key -> binding id
+    initial_eids = []    # binding id -> event_id it was first seen at
+    initial_values = []  # binding id -> value when first seen
+    last_rids = []       # binding id -> last bound resource_id
+    changes = []         # binding id -> list of (event_id, new value)
     total_changes = 0
 
+    prev_active = False  # whether the previous leaf action had the pipeline bound
+
+    # Replay stays serial on the one controller: ReplayController must only be
+    # used from the thread that opened it, and each extra OpenCapture would
+    # hold a full replay of the capture in GPU memory. Actions are visited in
+    # event order, so each SetFrameEvent moves forward from the previous one.
+    set_frame_event = controller.SetFrameEvent
+    get_pipeline_state = controller.GetPipelineState
+    binding_id_of = binding_ids.get
+
     for action in actions:
         eid = action.eventId
-        controller.SetFrameEvent(eid, False)
-        state = controller.GetPipelineState()
-
-        # Check if our pipeline is active
-        is_active = False
-        try:
-            if pipeline_type == "Graphics":
-                is_active = state.GetGraphicsPipelineObject() == pipeline_id
-            else:
-                is_active = state.GetComputePipelineObject() == pipeline_id
-        except Exception:
+        if eid in skip_event_ids:
+            prev_active = False
             continue
 
-        if not is_active:
+        # Still bound, and nothing since the previous (active) action could
+        # have changed a binding: no replay, and no change to record.
+        if prev_active and eid in unchanged_event_ids:
             continue
 
+        prev_active = False
+        set_frame_event(eid, False)
+        state = get_pipeline_state()
+
+        # Check if our pipeline is active
+        if pipeline_type is None:
+            pipeline_type = detect_pipeline_type(state, pipeline_id)
+            if pipeline_type is None:
+                continue
+            layout = build_binding_layout(state, pipeline_type)
+        else:
+            try:
+                if pipeline_type == "Graphics":
+                    is_active = state.GetGraphicsPipelineObject() == pipeline_id
+                else:
+                    is_active = state.GetComputePipelineObject() == pipeline_id
+            except Exception:
+                continue
+
+            if not is_active:
+                continue
+
+        prev_active = True
+
         # Extract current bindings
-        current_bindings = extract_current_bindings(controller, state, pipeline_type)
+        current_bindings = extract_current_bindings(resource_names, state, pipeline_type, layout)
 
-        # Compare with previous values
+        # Compare with previous values. The resource name is derived from
+        # the resource id, so comparing ids alone is enough.
         for key, value in current_bindings.items():
-            if key not in binding_initial:
+            binding_id = binding_id_of(key)
+            rid = value[0]
+            if binding_id is None:
                 # First time seeing this binding
-                binding_initial[key] = (eid, value)
-                binding_changes[key] = []
-                last_values[key] = value
-            elif value != last_values.get(key):
+                binding_ids[key] = len(initial_eids)
+                initial_eids.append(eid)
+                initial_values.append(value)
+                last_rids.append(rid)
+                changes.append([])
+            elif rid != last_rids[binding_id]:
                 # Value changed
-                binding_changes[key].append({
-                    "event_id": eid,
-                    "new_value": value,
-                })
+                changes[binding_id].append((eid, value))
                 total_changes += 1
-                last_values[key] = value
+                last_rids[binding_id] = rid
+
+    if pipeline_type is None:
+        raise RuntimeError(f"Pipeline '{pipeline_name}' is not used in any action.")
 
     # Build result
     bindings = []
-    for key, (init_eid, init_value) in sorted(binding_initial.items()):
-        stage_name, binding_type, set_num, binding_num, name = key
+    decoded = sorted((decode_binding_key(key), binding_id) for key, binding_id in binding_ids.items())
+    for (stage_name, binding_type, set_num, binding_num, name), binding_id in decoded:
         bindings.append({
             "stage": stage_name,
             "binding_type": binding_type,
             "set": set_num,
             "binding": binding_num,
             "name": name,
-            "initial_event_id": init_eid,
-            "initial_value": init_value,
-            "changes": binding_changes[key],
+            "initial_event_id": initial_eids[binding_id],
+            "initial_value": value_to_dict(initial_values[binding_id]),
+            "changes": [
+                {"event_id": change_eid, "new_value": value_to_dict(value)}
+                for change_eid, value in changes[binding_id]
+            ],
         })
 
     return {
@@ -311,8 +569,8 @@ def track_binding_changes(controller, pipeline_id, pipeline_name, actions):
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    with open(REQ_PATH, "r", encoding="utf-8") as f:
-        req = json.load(f)
+    with open(REQ_PATH, "rb") as f:
+        req = _loads(f.read())
 
     pipeline_name = req["pipeline_name"]
 
@@ -332,17 +590,35 @@ def main() -> None:
             raise RuntimeError("Couldn't initialise replay: " + str(result))
 
         try:
+            resources = controller.GetResources()
+            resource_names = {}
+            for res in resources:
+                resource_names[int(res.resourceId)] = res.name
+
             # Find the pipeline
-            pipe_res = find_pipeline(controller, pipeline_name)
+            pipe_res = find_pipeline(resources, pipeline_name)
             pipe_id = pipe_res.resourceId
 
             # Scan all actions
-            actions = list(flatten_actions(controller.GetRootActions()))
+            roots = controller.GetRootActions()
+            actions = list(flatten_actions(roots))
             if not actions:
                 raise RuntimeError("No actions found in capture")
 
+            # Actions where the pipeline provably isn't bound need no replay
+            skip_event_ids = frozenset()
+            unchanged_event_ids = frozenset()
+            sfile = controller.GetStructuredFile()
+            if sfile is not None:
+                skip_event_ids, unchanged_event_ids = find_skippable_events(
+                    sfile, roots, pipe_id
+                )
+
             # Track binding changes
-            result_doc = track_binding_changes(controller, pipe_id, pipe_res.name, actions)
+            result_doc = track_binding_changes(
+                controller, pipe_id, pipe_res.name, actions, resource_names,
+                skip_event_ids, unchanged_event_ids,
+            )
 
             write_envelope(True, result=result_doc)
         finally:
@@ -207,6 +207,15 @@ pub struct GetShaderDetailsResponse {
 pub struct GetBufferDetailsRequest {
     pub capture_path: String,
     pub buffer_name: String,
+    /// Only scan actions with event IDs in this inclusive range. Lets a caller
+    /// split a long capture across several replay processes and merge usages.
+    #[serde(default)]
+    pub event_id_min: Option<u32>,
+    #[serde(default)]
+    pub event_id_max: Option<u32>,
+    /// Report each usage's events as `event_ranges` instead of `event_ids`.
+    #[serde(default)]
+    pub compact_event_ids: bool,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
@@ -222,7 +231,12 @@ pub struct BufferUsage {
     pub pipeline: String,
     pub descriptor_set: String,
     pub binding: BufferBinding,
+    #[serde(default)]
     pub event_ids: Vec<u32>,
+    /// `[start, count]` runs of consecutive event IDs; set instead of
+    /// `event_ids` when the request asked for `compact_event_ids`.
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    pub event_ranges: Option<Vec<[u32; 2]>>,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
@@ -231,6 +245,13 @@ pub struct GetBufferDetailsResponse {
     #[schemars(schema_with = "any_json_schema::schema")]
     pub schema: serde_json::Value,
     pub stride: u64,
+    /// Python `struct` format string decoding one element (padding included).
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    pub struct_format: Option<String>,
+    /// NumPy structured dtype spec (`names`, `formats`, `offsets`, `itemsize`).
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    #[schemars(schema_with = "any_json_schema::schema")]
+    pub dtype: Option<serde_json::Value>,
     pub usages: Vec<BufferUsage>,
 }
 
@@ -286,15 +307,28 @@ pub struct GetBufferChangesDeltaRequest {
     pub buffer_name: String,
     #[serde(default = "default_tracked_indices")]
     pub tracked_indices: Vec<u32>,
+    /// Only track these struct fields (e.g. "position" or "lights[2].color").
+    /// A name also selects everything nested under it. Default: all fields.
+    #[serde(default)]
+    pub fields_filter: Option<Vec<String>>,
 }
 
 fn default_tracked_indices() -> Vec<u32> {
     vec![0]
 }
 
+#[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
+pub struct BufferTrackedField {
+    pub id: u32,
+    pub name: String,
+    #[serde(rename = "type")]
+    pub type_name: String,
+}
+
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
 pub struct BufferElementChange {
     pub event_id: u32,
+    /// `[[field_id, new_value], ...]`, with ids referencing `fields`.
     #[schemars(schema_with = "any_json_schema::schema")]
     pub delta: serde_json::Value,
 }
@@ -311,6 +345,8 @@ pub struct BufferElement {
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
 pub struct GetBufferChangesDeltaResponse {
     pub tracked_indices: Vec<u32>,
+    #[serde(default)]
+    pub fields: Vec<BufferTrackedField>,
     pub total_changes: u64,
     pub elements: Vec<BufferElement>,
 }
@@ -908,6 +944,14 @@ pub struct GetPipelineBindingChangesDeltaResponse {
 pub struct GetEventPipelineStateRequest {
     pub capture_path: String,
     pub event_id: u32,
+    /// Report `byteLength` for bound buffers. Turning this off skips the
+    /// buffer list lookup entirely.
+    #[serde(default = "default_include_buffer_sizes")]
+    pub include_buffer_sizes: bool,
+}
+
+fn default_include_buffer_sizes() -> bool {
+    true
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
@@ -951,8 +995,8 @@ pub struct PipelineResource {
     pub resource: String,
     #[serde(rename = "resourceId")]
     pub resource_id: String,
-    #[serde(skip_serializing_if = "Option::is_none")]
-    pub contents: Option<String>,
+    #[serde(skip_serializing_if = "Option::is_none", rename = "byteLength")]
+    pub byte_length: Option<u64>,
     #[serde(skip_serializing_if = "Option::is_none")]
     #[schemars(schema_with = "any_json_schema::schema")]
     pub layout: Option<serde_json::Value>,
@@ -971,8 +1015,8 @@ pub struct PipelineUniform {
     pub variable_count: u32,
     #[schemars(schema_with = "any_json_schema::schema")]
     pub variables: Vec<serde_json::Value>,
-    #[serde(skip_serializing_if = "Option::is_none")]
-    pub contents: Option<String>,
+    #[serde(skip_serializing_if = "Option::is_none", rename = "byteLength")]
+    pub byte_length: Option<u64>,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize, JsonSchema)]
@@ -1100,6 +1144,10 @@ pub struct FindResourceUsesRequest {
     /// Filter results by delta presence: "all" (default), "with_delta", "without_delta".
     #[serde(default = "default_delta_filter")]
     pub delta_filter: Option<String>,
+    /// Compare resource contents between usages to fill `has_delta`/`delta` (default true).
+    /// Set to false to only list usages with their pipeline info.
+    #[serde(default)]
+    pub track_data: Option<bool>,
 }
 
 fn default_delta_filter() -> Option<String> {
@@ -1870,6 +1918,9 @@ impl RenderDocInstallation {
         let req = GetBufferDetailsRequest {
             capture_path: resolve_path_string_from_cwd(cwd, &req.capture_path),
             buffer_name: req.buffer_name.clone(),
+            event_id_min: req.event_id_min,
+            event_id_max: req.event_id_max,
+            compact_event_ids: req.compact_event_ids,
         };
 
         std::fs::write(
@@ -1973,6 +2024,7 @@ impl RenderDocInstallation {
             capture_path: resolve_path_string_from_cwd(cwd, &req.capture_path),
             buffer_name: req.buffer_name.clone(),
             tracked_indices: req.tracked_indices.clone(),
+            fields_filter: req.fields_filter.clone(),
         };
 
         std::fs::write(
@@ -2178,6 +2230,7 @@ impl RenderDocInstallation {
         let req = GetEventPipelineStateRequest {
             capture_path: resolve_path_string_from_cwd(cwd, &req.capture_path),
             event_id: req.event_id,
+            include_buffer_sizes: req.include_buffer_sizes,
         };
 
         std::fs::write(
@@ -2335,6 +2388,7 @@ impl RenderDocInstallation {
             max_results: req.max_results,
             data_sample_bytes: req.data_sample_bytes,
             delta_filter: req.delta_filter.clone(),
+            track_data: req.track_data,
         };
 
         std::fs::write(
@@ -520,6 +520,13 @@ struct GetBufferDetailsRequest {
     cwd: Option<String>,
     capture_path: String,
     buffer_name: String,
+    #[serde(default)]
+    event_id_min: Option<u32>,
+    #[serde(default)]
+    event_id_max: Option<u32>,
+    /// Return each usage's events as [start, count] runs (event_ranges) instead of event_ids.
+    #[serde(default)]
+    compact_event_ids: bool,
 }
 
 #[derive(Debug, Deserialize, JsonSchema)]
@@ -538,6 +545,9 @@ struct GetBufferChangesDeltaRequest {
     buffer_name: String,
     #[serde(default = "default_tracked_indices")]
     tracked_indices: Vec<u32>,
+    /// Only track these struct fields (e.g. "position", "lights[2].color"); nested fields are included. Default: all.
+    #[serde(default)]
+    fields_filter: Option<Vec<String>>,
 }
 
 fn default_tracked_indices() -> Vec<u32> {
@@ -594,6 +604,13 @@ struct GetEventPipelineStateRequest {
     cwd: Option<String>,
     capture_path: String,
     event_id: u32,
+    /// Report byteLength for bound buffers (default true). Set false to skip the buffer lookup.
+    #[serde(default = "default_include_buffer_sizes")]
+    include_buffer_sizes: bool,
+}
+
+fn default_include_buffer_sizes() -> bool {
+    true
 }
 
 #[derive(Debug, Deserialize, JsonSchema)]
@@ -640,6 +657,9 @@ struct FindResourceUsesRequest {
     /// Filter by delta presence: "all" (default), "with_delta", "without_delta".
     #[serde(default)]
     delta_filter: Option<String>,
+    /// Compare data between usages to detect changes (default true). Set false for a faster usage-only listing.
+    #[serde(default)]
+    track_data: Option<bool>,
 }
 
 #[derive(Debug, Default, Clone, Copy, Deserialize, JsonSchema)]
@@ -1401,6 +1421,9 @@ impl RenderdogMcpServer {
                 &renderdog::GetBufferDetailsRequest {
                     capture_path: req.capture_path,
                     buffer_name: req.buffer_name,
+                    event_id_min: req.event_id_min,
+                    event_id_max: req.event_id_max,
+                    compact_event_ids: req.compact_event_ids,
                 },
             )
             .map_err(|e| {
@@ -1471,7 +1494,7 @@ impl RenderdogMcpServer {
 
     #[tool(
         name = "renderdoc_get_buffer_changes_delta",
-        description = "Track GPU buffer element changes across a frame. Reads data at specified element indices at every action and returns delta-encoded changes: initial_state for each element plus only the deltas where values actually changed."
+        description = "Track GPU buffer element changes across a frame. Reads data at specified element indices at every action and returns delta-encoded changes: initial_state for each element plus only the deltas where values actually changed. Deltas are [[field_id, new_value], ...] pairs referencing the top-level fields list."
     )]
     async fn get_buffer_changes_delta(
         &self,
@@ -1501,6 +1524,7 @@ impl RenderdogMcpServer {
                     capture_path: req.capture_path,
                     buffer_name: req.buffer_name,
                     tracked_indices: req.tracked_indices,
+                    fields_filter: req.fields_filter,
                 },
             )
             .map_err(|e| {
@@ -1705,6 +1729,7 @@ impl RenderdogMcpServer {
                 &renderdog::GetEventPipelineStateRequest {
                     capture_path: req.capture_path,
                     event_id: req.event_id,
+                    include_buffer_sizes: req.include_buffer_sizes,
                 },
             )
             .map_err(|e| {
@@ -1857,6 +1882,7 @@ impl RenderdogMcpServer {
                     max_results: req.max_results,
                     data_sample_bytes: req.data_sample_bytes,
                     delta_filter: req.delta_filter,
+                    track_data: req.track_data,
                 },
             )
             .map_err(|e| {